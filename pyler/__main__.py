@@ -1,13 +1,15 @@
 import os
-import glob
-import unittest
 import textwrap
 import argparse
-import re
 import sys
 import itertools
+import time
 
-from . import website as w
+from . import runner
+from . import scheduling
+from . import utils
+from .config import Config
+from .discovery import FILE_NAME_TEMPLATE, problem_index, select_files
 
 TEMPLATE = """from pyler import EulerProblem
 
@@ -31,9 +33,7 @@ if __name__ == '__main__':
 
 """
 
-FILE_NAME_TEMPLATE = "problem_{:04d}.py"
-FILE_NAME_REGEX = r"problem_(\d{4})\.py"
-FILE_NAME_GLOB = "problem_*.py"
+TESTS = ["simple", "real", "time", "memory"]
 
 
 def iter_problem_ids(problem_string):
@@ -69,87 +69,386 @@ def iter_problem_ids(problem_string):
     return sorted(ids)
 
 
+def count_argument(value, name, minimum):
+    try:
+        value = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "Incorrect number of {} (not an integer)".format(name))
+    if value < minimum:
+        raise argparse.ArgumentTypeError(
+            "Incorrect number of {} (less than {})".format(name, minimum))
+    return value
+
+
+def jobs_count(jobs):
+    return count_argument(jobs, "jobs", minimum=0)
+
+
+def runs_count(runs):
+    return count_argument(runs, "runs", minimum=1)
+
+
+def warmup_count(warmup):
+    return count_argument(warmup, "warmup runs", minimum=0)
+
+
+def sort_key(key):
+    # pstats is only loaded when profiling
+    import pstats
+
+    if key not in pstats.Stats.sort_arg_dict_default:
+        raise argparse.ArgumentTypeError(
+            "Incorrect sort key (one of {})".format(", ".join(
+                sorted(pstats.Stats.sort_arg_dict_default))))
+    return key
+
+
 def complete_problem_ids(problem_ids, path):
     if problem_ids == "all":
         return None
     elif problem_ids in ["next", "last"]:
-        last_problem = max(all_files(path))
-        last_id = int(re.match(FILE_NAME_REGEX, last_problem).groups()[0])
+        last_id = max(problem_index(path))
         if problem_ids == "next":
             return [last_id + 1]
         return [last_id]
     return problem_ids
 
 
-def all_files(path):
+def gen_files(problem_ids, path, force=False, template=None, jobs=1,
+              offline=False):
+    problem_ids = complete_problem_ids(problem_ids, path)
+    jobs = jobs or os.cpu_count()
+
+    # Loading bs4 and requests is left to the commands that need them
+    from . import website as w
+
+    website = w.Website()
+    website.offline = offline
+    if problem_ids is None:
+        # The problems known from the last sync are fetched `jobs` at a
+        # time, and the ones published since one at a time, until the
+        # first one that is not accessible
+        count = Config().problem_count() or 0
+        contents = itertools.chain(
+            w.iter_problem_contents(website, range(1, count + 1), jobs=jobs),
+            w.iter_problem_contents(website, itertools.count(count + 1)))
+    else:
+        contents = w.iter_problem_contents(
+            website, (int(problem_id) for problem_id in problem_ids),
+            jobs=jobs)
+    try:
+        for problem_id, doc in contents:
+
+            if template:
+                with open(template, "r") as template_handler:
+                    template_str = template_handler.read()
+            else:
+                template_str = TEMPLATE
+
+            doc = textwrap.fill(doc, 76).replace("\n", "\n    ")
+
+            file_path = os.path.join(
+                path, FILE_NAME_TEMPLATE.format(problem_id))
+
+            if not force and os.path.exists(file_path):
+                print("skipping {}".format(problem_id))
+                continue
+
+            file_name = FILE_NAME_TEMPLATE.format(problem_id)
+            with open(os.path.join(path, file_name), "w") as handler:
+                handler.write(template_str.format(
+                    problem_id=problem_id,
+                    doc=doc,
+                ))
+    except website.NotCached as exc:
+        sys.exit("{}: run pyler gen without --offline to fetch it".format(
+            exc))
+
+
+def test_files(problem_ids, path, only, skip, jobs=1, isolated=False,
+               incremental=False, memory_limit=None, trace_memory=False,
+               defer=False, report=None, output=None, clock="wall",
+               no_gc=False, cpus=None):
+    problem_ids = complete_problem_ids(problem_ids, path)
+
+    only = only or TESTS
+    tests = {"test_{}".format(test_name)
+             for test_name in set(only) - set(skip)}
+
+    py_files = select_files(problem_ids, path)
+
+    modules = [
+        "{}.Problem{}".format(file_name[:-3], file_name[-7:-3])
+        for file_name in py_files]
+
+    tests_names = sorted(
+        ".".join(module_test)
+        for module_test in itertools.product(modules, tests))
+
+    overrides = {}
+    if isolated:
+        overrides["isolated"] = True
+    if memory_limit is not None:
+        overrides["memory_limit"] = memory_limit
+    if trace_memory:
+        overrides["trace_memory"] = True
+    if defer:
+        overrides["defer_submission"] = True
+    if clock != "wall":
+        overrides["time_clock"] = clock
+    if no_gc:
+        overrides["disable_gc"] = True
+    if cpus:
+        overrides["cpus"] = cpus
+
+    groups = [
+        list(names) for __, names in itertools.groupby(
+            tests_names, key=lambda name: name.split(".")[0])]
+
+    if incremental:
+        from . import incremental as inc
+
+        results = inc.Results(path)
+        fingerprints = {}
+        stale_groups = []
+        for group in groups:
+            problem = runner.problem_name(group)
+            fingerprints[problem] = inc.fingerprint(
+                path, problem + ".py", extra=repr(sorted(overrides.items())))
+            tests_run = [name.split(".")[-1] for name in group]
+            if not results.is_fresh(problem, fingerprints[problem],
+                                    tests_run):
+                stale_groups.append(group)
+        print("Skipping {} unchanged problem(s)".format(
+            len(groups) - len(stale_groups)))
+        groups = stale_groups
+
+    durations = scheduling.Durations(path)
+    if jobs != 1:
+        groups = durations.schedule(groups)
+
+    records = runner.run_groups(
+        groups, path=os.path.abspath(path), jobs=jobs or os.cpu_count(),
+        overrides=overrides)
+
+    durations.update(records)
+    durations.save()
+
+    if incremental:
+        results.update(
+            {runner.problem_name(group): fingerprints[
+                runner.problem_name(group)] for group in groups},
+            records)
+        results.save()
+
+    if report:
+        from . import reports
+
+        reports.write(records, report, output or "pyler-report.{}".format(
+            "xml" if report == "junit" else "json"))
+
+    sys.exit(not runner.was_successful(records))
+
+
+def watch_files(problem_ids, path, skip, interval=.5, defer=False):
+    from . import watch
+
+    problem_ids = complete_problem_ids(problem_ids, path)
+    tests = [test for test in watch.TESTS if test not in skip]
+    overrides = {"defer_submission": True} if defer else {}
     try:
-        current = os.getcwd()
-        os.chdir(path)
-        return glob.glob(FILE_NAME_GLOB)
-    finally:
-        os.chdir(current)
+        watch.watch(path, problem_ids=problem_ids, tests=tests,
+                    interval=interval, overrides=overrides)
+    except KeyboardInterrupt:
+        pass
+
 
+def bench_files(problem_ids, path, runs=10, warmup=1, threshold=.2,
+                no_gc=False, cpus=None):
+    from . import bench
+    from . import execution
+
+    execution.pin_cpus(cpus)
 
-def gen_files(problem_ids, path, force=False, template=None):
     problem_ids = complete_problem_ids(problem_ids, path)
-    if problem_ids is None:
-        problem_ids = itertools.count(1)
+    history = bench.History(path)
+    baselines = history.baselines()
+    entries = []
+
+    print(bench.HEADER)
+    for file_name in select_files(problem_ids, path):
+        problem = file_name[:-3]
+        problem_class = runner.load_problem(problem, os.path.abspath(path))
+        if not problem_class.is_implemented():
+            continue
 
-    website = w.Website()
-    for problem_id in problem_ids:
+        entry = bench.summarize(*bench.measure(
+            problem_class, runs, warmup, disable_gc=no_gc))
+        entry.update(problem=problem, date=time.time(),
+                     regression=bench.is_regression(
+                         entry, baselines.get(problem), threshold))
+        print(bench.format_row(entry, baselines.get(problem), threshold))
+        entries.append(entry)
 
-        if template:
-            with open(template, "r") as template_handler:
-                template_str = template_handler.read()
-        else:
-            template_str = TEMPLATE
+    history.append(entries)
+    sys.exit(any(entry["regression"] for entry in entries))
 
-        problem_id = int(problem_id)
-        try:
-            doc = w.get_problem_content(website, problem_id)
-        except ValueError:
-            break
-        doc = textwrap.fill(doc, 76).replace("\n", "\n    ")
 
-        file_path = os.path.join(path, FILE_NAME_TEMPLATE.format(problem_id))
+def compare_files(problem_ids, path, runs=10, no_gc=False, cpus=None):
+    from . import execution
+    from . import variants
+
+    execution.pin_cpus(cpus)
 
-        if not force and os.path.exists(file_path):
-            print("skipping {}".format(problem_id))
+    problem_ids = complete_problem_ids(problem_ids, path)
+    failed = False
+
+    for file_name in select_files(problem_ids, path):
+        problem = file_name[:-3]
+        problem_class = runner.load_problem(problem, os.path.abspath(path))
+        names = problem_class.candidate_solvers()
+        if not names:
+            continue
+
+        print("{}\n{}".format(runner.SEPARATOR_BOLD, problem))
+        __, errors = variants.check(problem_class)
+        for error in errors:
+            print(error)
+        if errors:
+            failed = True
             continue
+        if len(names) < 2:
+            print("Only one solver, nothing to compare")
+            continue
+
+        print(variants.HEADER)
+        entries = variants.rank(*variants.measure(
+            problem_class, runs, disable_gc=no_gc))
+        for position, entry in enumerate(entries, 1):
+            print(variants.format_row(position, entry))
+
+    sys.exit(failed)
 
-        file_name = FILE_NAME_TEMPLATE.format(problem_id)
-        with open(os.path.join(path, file_name), "w") as handler:
-            handler.write(template_str.format(
-                problem_id=problem_id,
-                doc=doc,
-            ))
 
+def scale_files(problem_ids, path):
+    from . import scaling
 
-def test_files(problem_ids, path, only, skip):
     problem_ids = complete_problem_ids(problem_ids, path)
+    too_slow = False
+
+    for file_name in select_files(problem_ids, path):
+        problem = file_name[:-3]
+        problem_class = runner.load_problem(problem, os.path.abspath(path))
+        if not problem_class.is_implemented():
+            continue
+
+        print("{}\n{}".format(runner.SEPARATOR_BOLD, problem))
+        if len(problem_class.scaling_inputs) < 2:
+            print("Needs at least 2 scaling_inputs")
+            continue
+
+        print(scaling.HEADER)
+        points = scaling.measure(problem_class)
+        for size, duration in points:
+            print(scaling.format_row(size, duration))
+        try:
+            fit = scaling.Fit(points)
+        except ValueError as exc:
+            print(exc)
+            continue
+
+        real_size = None
+        if problem_class.real_input is not None:
+            real_size = problem_class("solve_real").input_size(
+                problem_class.real_input)
+        print(scaling.format_estimate(fit, real_size,
+                                      problem_class.time_limit))
+        if real_size is not None:
+            too_slow |= fit.project(real_size) > problem_class.time_limit
+
+    sys.exit(too_slow)
 
-    only = only or ["real", "simple", "time"]
-    tests = {"test_{}".format(test_name)
-             for test_name in set(only) - set(skip)}
 
-    sys.path.insert(0, os.path.abspath(path))
+def profile_files(problem_ids, path, simple=False, memory=False, top=20,
+                  sort="cumulative"):
+    from . import profiling
 
-    py_files = set(all_files(path))
+    problem_ids = complete_problem_ids(problem_ids, path)
+    method_name = "solve_simple" if simple else "solve_real"
+
+    for file_name in select_files(problem_ids, path):
+        problem = file_name[:-3]
+        problem_class = runner.load_problem(problem, os.path.abspath(path))
+        if not problem_class.is_implemented():
+            continue
 
+        print("{}\n{}.{}".format(runner.SEPARATOR_BOLD, problem, method_name))
+        profiler, snapshot, peak = profiling.profile(
+            problem_class, method_name, memory=memory)
+        profiling.write_report(sys.stdout, profiler, snapshot, top=top,
+                               sort=sort, peak=peak)
+        for saved in profiling.save(path, problem, profiler, snapshot):
+            print("Saved {}".format(saved))
+
+
+def submit(problem_ids, path):
+    problem_ids = complete_problem_ids(problem_ids, path)
+    config = Config()
+    pending = config.get_pending()
     if problem_ids is not None:
-        wanted_files = {FILE_NAME_TEMPLATE.format(problem_id)
-                        for problem_id in problem_ids}
-        py_files = py_files & wanted_files
+        pending = {problem_id: answer for problem_id, answer in pending.items()
+                   if problem_id in problem_ids}
+    if not pending:
+        print("No pending answer")
+        return
 
-    modules = [
-        "{}.Problem{}".format(file_name[:-3], file_name[-7:-3])
-        for file_name in py_files]
+    from . import website as w
 
-    tests_names = sorted(
-        ".".join(module_test)
-        for module_test in itertools.product(modules, tests))
+    # A single website, so that we log in (at most) once
+    website = w.Website()
+    wrong = []
+    for problem_id, answer in sorted(pending.items()):
+        correct = w.check_solution(website, problem_id, answer)
+        config.remove_pending(problem_id)
+        print("{}: {} is {}".format(
+            problem_id, answer, "correct" if correct else "wrong"))
+        if not correct:
+            wrong.append(problem_id)
 
-    unittest.main(module=None, argv=[""] + tests_names)
+    sys.exit(bool(wrong))
+
+
+def refresh_answers(problem_ids, path):
+    problem_ids = complete_problem_ids(problem_ids, path)
+    if problem_ids is None:
+        problem_ids = sorted(int(key) for key in Config()["answers"] or {})
+
+    from . import website as w
+
+    website = w.Website()
+    for problem_id in problem_ids:
+        answer = w.refresh_answer(website, problem_id)
+        print("{}: {}".format(
+            problem_id, "not solved" if answer is None else answer))
+
+
+def sync(path, answers=False):  # pylint: disable=unused-argument
+    from . import website as w
+
+    config = Config()
+    website = w.Website()
+    solved = w.sync_progress(website, config=config)
+
+    if answers:
+        for problem_id in sorted(solved):
+            if config.get_answer(problem_id) is None:
+                w.refresh_answer(website, problem_id, config=config)
+
+    print("{} problems, {} solved, {} answers known".format(
+        config.problem_count(), len(solved),
+        sum(1 for problem_id in solved
+            if config.get_answer(problem_id) is not None)))
 
 
 def main():
@@ -158,6 +457,14 @@ def main():
     parser.add_argument('--path', '-p', '--to',
                         default=".",
                         help="The folder in which problem files will be found")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        '--record', metavar="CASSETTE",
+        help="Record every response of the website in this file")
+    cassette_group.add_argument(
+        '--replay', metavar="CASSETTE",
+        help="Serve the responses recorded in this file instead of reaching "
+             "the website")
 
     problem_ids_kwargs = {
         "type": iter_problem_ids,
@@ -177,27 +484,190 @@ def main():
         '--template', '-t',
         help="Uses a specific template file (must contain {doc} and "
              "{problem_id}).")
+    parser_gen.add_argument(
+        '--jobs', '-j', type=jobs_count, default=1,
+        help="Number of problems fetched at once (0 for one per CPU)")
+    parser_gen.add_argument(
+        '--offline', action='store_true',
+        help="Only use the problems found in the local cache")
     parser_gen.add_argument(
         'problem_ids', **problem_ids_kwargs)
     parser_gen.set_defaults(callback=gen_files)
 
     parser_test = subparsers.add_parser('test', help="Tests")
 
-    tests = ["simple", "real", "time"]
     parser_test.add_argument('problem_ids', **problem_ids_kwargs)
     parser_test.add_argument(
         '--skip', action="append", default=[],
         help="Skip some tests among {}. (you can have several of these)"
-             "".format(", ".join(tests))
+             "".format(", ".join(TESTS))
     )
     parser_test.add_argument(
         '--only', action="append", default=[],
         help="Only run tests among {}. (you can have several of these)"
-             "".format(", ".join(tests))
+             "".format(", ".join(TESTS))
     )
+    parser_test.add_argument(
+        '--jobs', '-j', type=jobs_count, default=1,
+        help="Spread the problems across this many processes "
+             "(0 for one per CPU)")
+    parser_test.add_argument(
+        '--incremental', '-i', action='store_true',
+        help="Only run the problems that changed since they last passed")
+    parser_test.add_argument(
+        '--memory-limit', type=utils.parse_size,
+        help="Default memory limit of the solvers (e.g. 512M, 2G), "
+             "checked by the memory test")
+    parser_test.add_argument(
+        '--trace-memory', action='store_true',
+        help="Also report the peak of memory allocated by Python "
+             "(makes the solvers slower)")
+    parser_test.add_argument(
+        '--isolated', action='store_true',
+        help="Run each solver in a child process that gets killed at "
+             "the time limit")
+    parser_test.add_argument(
+        '--defer', action='store_true',
+        help="Queue the answers that are not known yet instead of "
+             "submitting them (see pyler submit)")
+    parser_test.add_argument(
+        '--clock', choices=["wall", "cpu"], default="wall",
+        help="Clock of the time limits: wall time, or CPU time of the "
+             "solver's process (steadier on a busy machine)")
+    parser_test.add_argument(
+        '--no-gc', action='store_true',
+        help="Disable the garbage collector while timing the real solver")
+    parser_test.add_argument(
+        '--cpus', type=utils.parse_cpus,
+        help="Pin the solvers to these CPUs (e.g. 2,3 or 0-3), where the "
+             "OS allows it")
+    parser_test.add_argument(
+        '--report', choices=["json", "junit"],
+        help="Also write a machine-readable report of the run, with the "
+             "outcome and timings of every problem")
+    parser_test.add_argument(
+        '--output', '-o',
+        help="File of the report (default: pyler-report.json or "
+             "pyler-report.xml)")
     parser_test.set_defaults(callback=test_files)
 
+    parser_watch = subparsers.add_parser(
+        'watch',
+        help="Run the tests of a problem again each time its file is saved")
+    parser_watch.add_argument(
+        'problem_ids', nargs="?", default="all", **problem_ids_kwargs)
+    parser_watch.add_argument(
+        '--skip', action="append", default=[],
+        help="Skip some tests among simple, real, time. (you can have "
+             "several of these)")
+    parser_watch.add_argument(
+        '--interval', type=float, default=.5,
+        help="Seconds between two checks of the files")
+    parser_watch.add_argument(
+        '--defer', action='store_true',
+        help="Queue the answers that are not known yet instead of "
+             "submitting them (see pyler submit)")
+    parser_watch.set_defaults(callback=watch_files)
+
+    parser_bench = subparsers.add_parser(
+        'bench',
+        help="Time the real solver over several runs and compare with "
+             "the previous benchmark")
+    parser_bench.add_argument('problem_ids', **problem_ids_kwargs)
+    parser_bench.add_argument(
+        '--runs', '-r', type=runs_count, default=10,
+        help="Number of measured runs")
+    parser_bench.add_argument(
+        '--warmup', '-w', type=warmup_count, default=1,
+        help="Number of runs before measuring")
+    parser_bench.add_argument(
+        '--threshold', type=float, default=.2,
+        help="Slowdown of the median, relative to the previous benchmark, "
+             "considered a regression (default: 0.2, i.e. 20%%)")
+    parser_bench.add_argument(
+        '--no-gc', action='store_true',
+        help="Disable the garbage collector during the measured runs")
+    parser_bench.add_argument(
+        '--cpus', type=utils.parse_cpus,
+        help="Pin the benchmark to these CPUs (e.g. 2,3 or 0-3), where the "
+             "OS allows it")
+    parser_bench.set_defaults(callback=bench_files)
+
+    parser_compare = subparsers.add_parser(
+        'compare',
+        help="Check the solver_* variants of a problem against each other "
+             "and rank them by speed")
+    parser_compare.add_argument('problem_ids', **problem_ids_kwargs)
+    parser_compare.add_argument(
+        '--runs', '-r', type=runs_count, default=10,
+        help="Number of measured runs of each solver")
+    parser_compare.add_argument(
+        '--no-gc', action='store_true',
+        help="Disable the garbage collector during the measured runs")
+    parser_compare.add_argument(
+        '--cpus', type=utils.parse_cpus,
+        help="Pin the comparison to these CPUs (e.g. 2,3 or 0-3), where the "
+             "OS allows it")
+    parser_compare.set_defaults(callback=compare_files)
+
+    parser_scale = subparsers.add_parser(
+        'scale',
+        help="Time the solver over its scaling_inputs, estimate its "
+             "complexity and project the time of the real input")
+    parser_scale.add_argument('problem_ids', **problem_ids_kwargs)
+    parser_scale.set_defaults(callback=scale_files)
+
+    parser_profile = subparsers.add_parser(
+        'profile',
+        help="Profile the solver with cProfile (and tracemalloc)")
+    parser_profile.add_argument('problem_ids', **problem_ids_kwargs)
+    parser_profile.add_argument(
+        '--simple', action='store_true',
+        help="Profile the simple input instead of the real one")
+    parser_profile.add_argument(
+        '--memory', '-m', action='store_true',
+        help="Also trace the memory allocations")
+    parser_profile.add_argument(
+        '--top', type=int, default=20,
+        help="Number of functions and allocation sites shown")
+    parser_profile.add_argument(
+        '--sort', type=sort_key, default="cumulative",
+        help="pstats sort key (e.g. cumulative, tottime, calls)")
+    parser_profile.set_defaults(callback=profile_files)
+
+    parser_submit = subparsers.add_parser(
+        'submit',
+        help="Submit the answers queued by pyler test --defer")
+    parser_submit.add_argument(
+        'problem_ids', nargs="?", default="all", **problem_ids_kwargs)
+    parser_submit.set_defaults(callback=submit)
+
+    parser_refresh = subparsers.add_parser(
+        'refresh',
+        help="Reload the locally known answers from the website")
+    parser_refresh.add_argument('problem_ids', **problem_ids_kwargs)
+    parser_refresh.set_defaults(callback=refresh_answers)
+
+    parser_sync = subparsers.add_parser(
+        'sync',
+        help="Read the progress page: store the number of problems, and "
+             "count the solved ones")
+    parser_sync.add_argument(
+        '--answers', '-a', action='store_true',
+        help="Also fetch the answers of solved problems that are not "
+             "known yet (one request per problem)")
+    parser_sync.set_defaults(callback=sync)
+
     args = vars(parser.parse_args())
+    record, replay = args.pop("record"), args.pop("replay")
+    if replay and not os.path.isfile(replay):
+        parser.error("Cassette {} not found".format(replay))
+    if record or replay:
+        # Through the environment, so that the test workers see it too
+        from . import cassette
+
+        os.environ[cassette.CASSETTE_ENV] = os.path.abspath(record or replay)
+        os.environ[cassette.MODE_ENV] = "record" if record else "replay"
     args.pop("callback")(**args)
 
 
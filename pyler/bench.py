@@ -0,0 +1,113 @@
+"""
+Benchmarks the real solver of problems over repeated runs, keeps a
+history of the results and flags regressions against the last one.
+"""
+import json
+import math
+import os
+import statistics
+
+from . import execution
+
+HISTORY_FILE = os.path.join(".pyler", "bench.jsonl")
+
+HEADER = "{:<14}{:>6}{:>12}{:>12}{:>12}{:>12}{:>12}  {}".format(
+    "problem", "runs", "min", "median", "p95", "stddev", "cpu median",
+    "vs baseline")
+
+
+def measure(problem_class, runs, warmup=1, disable_gc=False):
+    """
+    Prepares the problem, calls solve_real warmup + runs times, and
+    returns the wall and the CPU durations of the last runs.
+    """
+    problem = problem_class("solve_real")
+    # The one-time preparation is not part of the measured runs
+    problem.run_prepare()
+    for __ in range(warmup):
+        problem.solve_real()
+
+    timings, cpu_timings = [], []
+    for __ in range(runs):
+        with execution.Timer(disable_gc=disable_gc) as timer:
+            problem.solve_real()
+        timings.append(timer.elapsed)
+        cpu_timings.append(timer.cpu_time)
+    return timings, cpu_timings
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile
+    """
+    values = sorted(values)
+    rank = max(int(math.ceil(percent / 100. * len(values))), 1)
+    return values[rank - 1]
+
+
+def summarize(timings, cpu_timings=None):
+    summary = {
+        "runs": len(timings),
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "p95": percentile(timings, 95),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.,
+    }
+    if cpu_timings:
+        summary["cpu_median"] = statistics.median(cpu_timings)
+    return summary
+
+
+class History(object):
+    """
+    Every benchmark ever run, one JSON object per line
+    """
+
+    def __init__(self, path):
+        self.file_path = os.path.join(path, HISTORY_FILE)
+
+    def entries(self):
+        try:
+            with open(self.file_path, "r") as handler:
+                return [json.loads(line) for line in handler if line.strip()]
+        except IOError:
+            return []
+
+    def baselines(self):
+        """
+        Returns the last entry of each problem that was not a regression,
+        so that a regression is flagged until it is fixed
+        """
+        return {entry["problem"]: entry for entry in self.entries()
+                if not entry.get("regression")}
+
+    def append(self, entries):
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        with open(self.file_path, "a") as handler:
+            for entry in entries:
+                handler.write(json.dumps(entry, sort_keys=True) + "\n")
+
+
+def is_regression(entry, baseline, threshold):
+    """
+    Whether the median got slower than the baseline's by more
+    than threshold (a ratio, e.g. .2 for 20%)
+    """
+    return bool(baseline and
+                entry["median"] > baseline["median"] * (1 + threshold))
+
+
+def format_row(entry, baseline, threshold):
+    row = "{problem:<14}{runs:>6}{min:>11.4f}s{median:>11.4f}s{p95:>11.4f}s" \
+          "{stddev:>11.4f}s".format(**entry)
+    if "cpu_median" in entry:
+        row += "{:>11.4f}s".format(entry["cpu_median"])
+    else:
+        row += "{:>12}".format("-")
+    if baseline:
+        change = entry["median"] / baseline["median"] - 1 \
+            if baseline["median"] else 0.
+        row += "  {:+.0%}".format(change)
+        if is_regression(entry, baseline, threshold):
+            row += "  REGRESSION"
+    return row
@@ -0,0 +1,108 @@
+"""
+On-disk cache of the pages we GET from the website, revalidated with
+their ETag / Last-Modified headers once they are older than a TTL.
+"""
+import hashlib
+import json
+import os
+import time
+
+from . import utils
+
+
+def default_directory():
+    return os.environ.get("PYLER_CACHE") or os.path.expanduser(
+        os.path.join("~", ".cache", "pyler"))
+
+
+class StoredResponse(object):
+    """
+    A response read from disk (the cache, or a cassette). Quacks enough
+    like a requests.Response for the rest of the code.
+    """
+
+    def __init__(self, url, content, headers, status_code=200):
+        self.url = url
+        self.content = content
+        self.headers = headers
+        self.status_code = status_code
+
+
+class CachedResponse(StoredResponse):
+    """
+    A response read from the cache, along with the time we last knew
+    it was up to date
+    """
+
+    def __init__(self, url, content, headers, stored_at):
+        super().__init__(url, content, headers)
+        self.stored_at = stored_at
+
+    def is_fresh(self, ttl):
+        return time.time() - self.stored_at < ttl
+
+    def validators(self):
+        """
+        Returns the headers of a conditional request for this page
+        """
+        headers = {}
+        if self.headers.get("ETag"):
+            headers["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+
+class HttpCache(object):
+    """
+    Stores, for each url, the body of the page and a JSON file with
+    its validating headers and the time we last knew it was up to date.
+    """
+    kept_headers = ("ETag", "Last-Modified")
+
+    def __init__(self, directory=None, ttl=7 * 24 * 3600):
+        self.directory = directory or default_directory()
+        self.ttl = ttl
+
+    def path(self, url):
+        return os.path.join(
+            self.directory, hashlib.sha1(url.encode("utf-8")).hexdigest())
+
+    def get(self, url):
+        """
+        Returns the CachedResponse for the url, or None
+        """
+        path = self.path(url)
+        try:
+            with open(path + ".json", "r") as handler:
+                meta = json.load(handler)
+            with open(path + ".body", "rb") as handler:
+                content = handler.read()
+        except (IOError, ValueError):
+            return None
+
+        return CachedResponse(url=url, content=content,
+                              headers=meta["headers"],
+                              stored_at=meta["stored_at"])
+
+    def store(self, url, response):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(url)
+        headers = {name: response.headers[name]
+                   for name in self.kept_headers
+                   if response.headers.get(name)}
+
+        utils.write_atomic(path + ".body", response.content)
+        self.write_meta(url, headers)
+
+    def touch(self, cached):
+        """
+        Marks a cached page as up to date (after a 304)
+        """
+        cached.stored_at = time.time()
+        self.write_meta(cached.url, cached.headers)
+
+    def write_meta(self, url, headers):
+        meta = {"url": url, "headers": headers, "stored_at": time.time()}
+        utils.write_atomic(self.path(url) + ".json",
+                           json.dumps(meta).encode("utf-8"))
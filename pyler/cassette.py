@@ -0,0 +1,132 @@
+"""
+Records the exchanges with the website in a cassette file, and replays
+them later without any network access.
+
+A cassette has one JSON line per response: the method and url of the
+request (not its data, which may hold credentials), the status, a few
+headers and the zlib-compressed content. Responses to the same request
+are replayed in the order they were recorded, the last one being served
+again once they are exhausted.
+"""
+import base64
+import collections
+import json
+import os
+import threading
+import zlib
+
+import requests
+
+from . import utils
+from .cache import StoredResponse
+
+# Set by pyler --record / --replay, so that the worker processes use
+# the cassette too
+CASSETTE_ENV = "PYLER_CASSETTE"
+MODE_ENV = "PYLER_CASSETTE_MODE"
+
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class CassetteMiss(LookupError):
+    """
+    The request was not recorded in the cassette
+    """
+
+
+def from_environment():
+    """
+    Returns the (mode, path) of the cassette set up by the command
+    line, or None
+    """
+    path = os.environ.get(CASSETTE_ENV)
+    if not path:
+        return None
+    return os.environ.get(MODE_ENV, "replay"), path
+
+
+def encode(method, url, response):
+    return json.dumps({
+        "method": method,
+        # The url we asked for, not the one we were redirected to
+        "url": url,
+        "status": response.status_code,
+        "headers": {name: response.headers[name] for name in KEPT_HEADERS
+                    if response.headers.get(name)},
+        "content": base64.b64encode(
+            zlib.compress(response.content)).decode("ascii"),
+    }, sort_keys=True)
+
+
+def decode(line):
+    entry = json.loads(line)
+    return entry["method"], StoredResponse(
+        url=entry["url"], status_code=entry["status"],
+        headers=entry["headers"],
+        content=zlib.decompress(base64.b64decode(entry["content"])))
+
+
+class RecordingSession(object):
+    """
+    Wraps a requests.Session and appends every response to the cassette
+    """
+
+    def __init__(self, session, path):
+        self.session = session
+        self.path = path
+
+    @property
+    def cookies(self):
+        return self.session.cookies
+
+    @cookies.setter
+    def cookies(self, cookies):
+        self.session.cookies = cookies
+
+    def record(self, method, url, response):
+        line = encode(method, url, response) + "\n"
+        # Several processes may record at once
+        with utils.locked(self.path):
+            with open(self.path, "a") as handler:
+                handler.write(line)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.record("get", url, self.session.get(url, **kwargs))
+
+    def post(self, url, **kwargs):
+        return self.record("post", url, self.session.post(url, **kwargs))
+
+
+class ReplaySession(object):
+    """
+    Serves the responses of a cassette in place of a requests.Session.
+    Raises CassetteMiss for any request that was not recorded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.cookies = requests.cookies.RequestsCookieJar()
+        self.lock = threading.Lock()
+        self.responses = collections.defaultdict(collections.deque)
+        with open(path, "r") as handler:
+            for line in handler:
+                if line.strip():
+                    method, response = decode(line)
+                    self.responses[method, response.url].append(response)
+
+    def replay(self, method, url):
+        with self.lock:
+            responses = self.responses.get((method, url))
+            if not responses:
+                raise CassetteMiss("{} {} is not in the cassette {}".format(
+                    method.upper(), url, self.path))
+            if len(responses) > 1:
+                return responses.popleft()
+            return responses[0]
+
+    def get(self, url, **kwargs):  # pylint: disable=unused-argument
+        return self.replay("get", url)
+
+    def post(self, url, **kwargs):  # pylint: disable=unused-argument
+        return self.replay("post", url)
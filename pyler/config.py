@@ -1,14 +1,37 @@
+"""
+The configuration file, shared by every pyler process (including the
+parallel test workers). Its parsed contents are cached until the file
+changes, and it is only ever replaced atomically, under a lock.
+"""
+import contextlib
+import copy
 import json
 import os
 
 from . import utils
 
+# {config file path: (stat signature, parsed contents)}
+_contents = {}
+
+
+def signature(path):
+    """
+    Returns what changes whenever the file is replaced or modified,
+    or None if it does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
 
 class Config():
 
     def __getitem__(self, name):
         try:
-            return self.get_config()[name]
+            # Callers are free to modify what they get
+            return copy.deepcopy(self.read()[name])
         except KeyError:
             return None
 
@@ -26,23 +49,59 @@ class Config():
             ".pyler.conf",
         ]), ".pyler.conf")
 
-    def get_config(self):
+    def read(self):
+        """
+        Returns the parsed contents of the config file, only reading it
+        again if it changed. The result must not be modified.
+        """
+        config_file = self.config_file
+        file_signature = signature(config_file)
+        cached = _contents.get(config_file)
+        if cached and cached[0] == file_signature:
+            return cached[1]
+
         try:
-            with open(self.config_file, "r") as handler:
+            with open(config_file, "r") as handler:
                 config = json.load(handler)
         except (IOError, ValueError):
             config = {}
 
+        _contents[config_file] = (file_signature, config)
         return config
 
+    def get_config(self):
+        return copy.deepcopy(self.read())
+
     def write_elements(self, **kwargs):
-        config = self.get_config()
-        config.update(kwargs)
-        self.save_config(config)
+        # Reading within the lock, so that concurrent writers don't lose
+        # each other's changes
+        with utils.locked(self.config_file):
+            config = self.get_config()
+            config.update(kwargs)
+            self.write(config)
+
+    @contextlib.contextmanager
+    def edit_dict(self, name):
+        """
+        Yields the dict stored under name (empty if missing) to be
+        modified in place, and saves it, all within the lock
+        """
+        with utils.locked(self.config_file):
+            config = self.get_config()
+            value = config.get(name) or {}
+            yield value
+            config[name] = value
+            self.write(config)
 
     def save_config(self, config):
-        with open(self.config_file, "w") as handler:
-            json.dump(config, handler)
+        with utils.locked(self.config_file):
+            self.write(config)
+
+    def write(self, config):
+        config_file = self.config_file
+        utils.write_atomic(config_file, json.dumps(config).encode("utf-8"))
+        _contents[config_file] = (signature(config_file),
+                                  copy.deepcopy(config))
 
     def get_or_ask_for_credentials(self):
         credentials = self["credentials"] or {}
@@ -59,3 +118,42 @@ class Config():
         self["credentials"] = credentials
 
         return credentials
+
+    def set_progress(self, count):
+        self["progress"] = {"count": count}
+
+    def problem_count(self):
+        """
+        Returns the number of problems as of the last sync, or None
+        """
+        return (self["progress"] or {}).get("count")
+
+    def get_answer(self, problem_id):
+        """
+        Returns the known answer of a problem, or None
+        """
+        return (self["answers"] or {}).get(str(problem_id))
+
+    def set_answer(self, problem_id, answer):
+        with self.edit_dict("answers") as answers:
+            answers[str(problem_id)] = answer
+
+    def forget_answer(self, problem_id):
+        with self.edit_dict("answers") as answers:
+            answers.pop(str(problem_id), None)
+
+    def get_pending(self):
+        """
+        Returns the answers waiting to be submitted, as a dict
+        {problem_id: answer}
+        """
+        return {int(problem_id): answer
+                for problem_id, answer in (self["pending"] or {}).items()}
+
+    def add_pending(self, problem_id, answer):
+        with self.edit_dict("pending") as pending:
+            pending[str(problem_id)] = answer
+
+    def remove_pending(self, problem_id):
+        with self.edit_dict("pending") as pending:
+            pending.pop(str(problem_id), None)
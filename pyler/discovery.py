@@ -0,0 +1,51 @@
+"""
+Finds the problem files of a folder. The folder is scanned once, and the
+result is kept until its modification time changes (i.e. until files are
+added, removed or renamed).
+"""
+import os
+import re
+
+FILE_NAME_TEMPLATE = "problem_{:04d}.py"
+FILE_NAME_REGEX = re.compile(r"problem_(\d{4})\.py$")
+
+# {absolute path: (modification time, index)}
+_indexes = {}
+
+
+def scan(path):
+    index = {}
+    for entry in os.scandir(path):
+        match = FILE_NAME_REGEX.match(entry.name)
+        if match and entry.is_file():
+            index[int(match.group(1))] = entry.name
+    return index
+
+
+def problem_index(path):
+    """
+    Returns a dict {problem_id: file name} of the problem files in path
+    """
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+
+    cached = _indexes.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    index = scan(path)
+    _indexes[path] = (mtime, index)
+    return index
+
+
+def select_files(problem_ids, path):
+    """
+    Returns the sorted names of the existing problem files among the
+    given problem ids, or all of them if None.
+    """
+    index = problem_index(path)
+    if problem_ids is None:
+        problem_ids = index
+    return [index[problem_id]
+            for problem_id in sorted(set(problem_ids))
+            if problem_id in index]
@@ -1,8 +1,14 @@
 import signal
-import unittest
 import time
+import traceback
+import unittest
 
-from . import website as w
+from . import execution
+from . import utils
+from .config import Config
+
+# Value of _prepared until prepare has run
+NOT_PREPARED = object()
 
 
 class EulerProblem(unittest.TestCase):
@@ -15,6 +21,39 @@ class EulerProblem(unittest.TestCase):
     simple_input = None
     simple_output = None
     real_input = None
+    # Inputs of increasing size, for "pyler scale" to estimate how the
+    # solver scales up to the real input
+    scaling_inputs = ()
+
+    # Result and duration of prepare, shared by the instances of a class
+    _prepared = NOT_PREPARED
+    _prepare_time = None
+
+    def prepare(self):
+        """
+        Precomputes what the solver needs (prime sieves, tables...) and
+        returns it. Runs once per class, and its result is shared by every
+        solve as self.prepared. Its duration is reported separately.
+        """
+        return None
+
+    def run_prepare(self):
+        """
+        Runs prepare, once per class, and returns how long it took
+        """
+        cls = type(self)
+        if cls._prepared is NOT_PREPARED:
+            before = time.perf_counter()
+            # prepare is meant to be overridden
+            # pylint: disable=assignment-from-none
+            cls._prepared = self.prepare()
+            cls._prepare_time = time.perf_counter() - before
+        return cls._prepare_time
+
+    @property
+    def prepared(self):
+        self.run_prepare()
+        return type(self)._prepared
 
     def solve_real(self):
         """
@@ -28,11 +67,48 @@ class EulerProblem(unittest.TestCase):
         """
         return self.solver(self.simple_input)
 
+    def input_size(self, input_val):
+        """
+        Returns the size of an input, for the scaling analysis: the input
+        itself if it is a number, else its length. Override it for other
+        inputs.
+        """
+        if isinstance(input_val, (int, float)):
+            return abs(input_val)
+        return len(input_val)
+
+    @classmethod
+    def is_implemented(cls):
+        return cls.solver is not EulerProblem.solver
+
+    @classmethod
+    def candidate_solvers(cls):
+        """
+        Returns the names of the candidate solvers: the solver_* methods,
+        and solver itself unless it is one of them (solver = solver_fast)
+        """
+        names = sorted(name for name in dir(cls)
+                       if name.startswith("solver_") and
+                       callable(getattr(cls, name)))
+        functions = {getattr(cls, name) for name in names}
+        if cls.is_implemented() and cls.solver not in functions:
+            names.insert(0, "solver")
+        return names
+
     @classmethod
     def setUpClass(cls):
-        if cls.solver is EulerProblem.solver:
+        if not cls.is_implemented():
             raise unittest.SkipTest(
                 "Not running the tests for a not implemented problem")
+        cls._real_execution = None
+        cls._prepared, cls._prepare_time = NOT_PREPARED, None
+
+    @classmethod
+    def tearDownClass(cls):
+        # Prepared tables (sieves...) can be big: free them for the
+        # next problems of the run
+        cls._real_execution = None
+        cls._prepared, cls._prepare_time = NOT_PREPARED, None
 
     def test_simple(self):
         """
@@ -40,37 +116,152 @@ class EulerProblem(unittest.TestCase):
         """
         self.assertEqual(self.solve_simple(), self.simple_output)
 
+    # Windows has no Alarm signal. Sorry pal.
+    use_signal = hasattr(signal, "SIGALRM")
+
+    # Run solve_real in a child process, killed at the time limit
+    isolated = False
+    time_limit = 60
+    # Clock of the time limit: "wall" or "cpu" (the CPU time of the
+    # process, which other processes of a busy machine don't inflate)
+    time_clock = "wall"
+    # Disable the garbage collector while solve_real is timed
+    disable_gc = False
+    # CPUs the solver is pinned to (e.g. {2, 3}), where the OS allows it
+    cpus = None
+
+    # Memory limit of the solver, in bytes (None for no limit). With a
+    # limit, solve_real runs in a child process.
+    memory_limit = None
+    # Also measure the peak of memory allocated by Python (slower)
+    trace_memory = False
+
+    # Queue the answers that are not known locally for "pyler submit"
+    # instead of submitting them (which needs a captcha) during the tests
+    defer_submission = False
+    # Set when test_real queued its answer
+    submission_pending = False
+
+    # Shared by test_real, test_time and test_memory within a test run
+    _real_execution = None
+
+    def run_real(self):
+        """
+        Runs solve_real within the time limit and returns an Execution.
+        The solver only runs once per test run, and its Execution is then
+        shared by every test.
+        """
+        cls = type(self)
+        if cls._real_execution is None:
+            cls._real_execution = self.execute_real()
+        self.record_execution(cls._real_execution)
+        return cls._real_execution
+
+    def execute_real(self):
+        if self.isolated or self.memory_limit is not None:
+            return execution.run_isolated(
+                type(self), "solve_real", self.time_limit,
+                memory_limit=self.memory_limit,
+                trace_memory=self.trace_memory, clock=self.time_clock,
+                disable_gc=self.disable_gc, cpus=self.cpus)
+        try:
+            with execution.pinned_cpus(self.cpus):
+                # A preparation that hangs is interrupted too
+                prepared = execution.run_in_process(
+                    self.run_prepare, self.time_limit,
+                    use_signal=self.use_signal, clock=self.time_clock)
+                if prepared.reason == "timeout":
+                    return prepared
+                real = execution.run_in_process(
+                    self.solve_real, self.time_limit,
+                    use_signal=self.use_signal, clock=self.time_clock,
+                    disable_gc=self.disable_gc)
+        except Exception:  # pylint: disable=broad-except
+            # Shared like any other outcome, as in isolated mode
+            return execution.Execution("error",
+                                       details=traceback.format_exc())
+        real.prepare_time = prepared.result
+        return real
+
+    def record_execution(self, real):
+        """
+        Keeps the measurements of the execution, for the test reports
+        """
+        self.measurements = {
+            name: getattr(real, name)
+            for name in ("prepare_time", "elapsed", "cpu_time", "peak_rss",
+                         "peak_traced")
+            if getattr(real, name) is not None}
+
+    def fail_execution(self, real):
+        if real.timed_out:
+            self.fail("Test failed to end in less than {} seconds ({} "
+                      "time).".format(self.time_limit, self.time_clock))
+        self.fail("Solver did not return:\n{}".format(real.details))
+
     def test_real(self):
         """
-        Checks the real problem against the website
+        Checks the real problem against the known answer, or else
+        against the website
         """
+        real = self.run_real()
+        if not real.returned:
+            self.fail_execution(real)
+
+        config = Config()
+        good_solution = config.get_answer(self.problem_id)
+        if good_solution is not None:
+            self.measurements["answer_source"] = "cache"
+            if self.problem_id in config.get_pending():
+                config.remove_pending(self.problem_id)
+            self.assertTrue(good_solution == real.result)
+            return
+
+        if self.defer_submission:
+            self.measurements["answer_source"] = "pending"
+            config.add_pending(self.problem_id, real.result)
+            self.submission_pending = True
+            self.skipTest("Answer {!r} is pending submission".format(
+                real.result))
+
+        # bs4 and requests are only loaded by the tests that need them
+        from . import website as w
+
+        self.measurements["answer_source"] = "network"
         website = w.Website()
-        real_output = self.solve_real()
         self.assertTrue(w.check_solution(
-            website, self.problem_id, solution=real_output))
-
-    # Windows has no Alarm signal. Sorry pal.
-    use_signal = hasattr(signal, "SIGALRM")
+            website, self.problem_id, solution=real.result))
 
     def test_time(self):
         """
-        Checks that the real problem runs under a minute
+        Checks that the real problem runs under the time limit
         """
-        time_limit = 60
+        real = self.run_real()
+        if real.reason != "finished":
+            self.fail_execution(real)
+        # The preparation is only measured in wall time
+        total = (real.prepare_time or 0) + real.time(self.time_clock)
+        if total > self.time_limit:
+            self.fail("Test failed to end in less than {} seconds ({} time, "
+                      "including {:.1f}s of preparation).".format(
+                          self.time_limit, self.time_clock,
+                          real.prepare_time))
 
-        try:
-            if self.use_signal:
-                def handler(signum, frame):  # pylint: disable=unused-argument
-                    raise TimeoutError()
-                old_handler = signal.signal(signal.SIGALRM, handler)
-                signal.alarm(time_limit)
-            before = time.time()
-            self.solve_real()
-            after = time.time()
-            if after - before > time_limit:
-                raise TimeoutError()
-        except TimeoutError:
-            self.fail("Test failed to end in less than a minute.")
-        finally:
-            if self.use_signal:
-                signal.signal(signal.SIGALRM, old_handler)
+    def test_memory(self):
+        """
+        Checks that the real problem runs within the memory limit, if
+        it has one
+        """
+        if self.memory_limit is None:
+            # Nothing to check: passing silently keeps the default test
+            # runs free of one skip per problem
+            return
+        if execution.resource is None:
+            self.skipTest("Memory limits need the resource module")
+
+        real = self.run_real()
+        if real.reason == "out_of_memory":
+            self.fail("Test used more than {} of memory.".format(
+                utils.format_size(self.memory_limit)))
+        if not real.returned:
+            self.fail_execution(real)
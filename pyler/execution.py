@@ -0,0 +1,315 @@
+"""
+Runs a solver within a time limit, either in the current process or
+in an isolated child process that gets killed once the limit is reached.
+
+Both the wall time (perf_counter) and the CPU time (process_time) of the
+solver are measured, and the time limit applies to either clock.
+"""
+import contextlib
+import gc
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class Execution(object):
+    """
+    Outcome of running a solver. The reason is one of:
+
+    - "finished": the solver returned in time
+    - "overtime": the solver returned, but after the time limit
+    - "timeout": the solver was interrupted at the time limit
+    - "error": the solver raised an exception (see details)
+    - "out_of_memory": the solver went over the memory limit
+    - "crashed": the process running the solver died (see details)
+
+    elapsed is the wall time of the solver, and cpu_time its CPU time.
+    Isolated executions also measure the peak resident memory of their
+    process and, if asked, the peak of memory traced by tracemalloc
+    (both in bytes). Executions of problems with a preparation phase
+    report its duration apart, as prepare_time.
+    """
+
+    def __init__(self, reason, result=None, elapsed=None, details="",
+                 cpu_time=None):
+        self.reason = reason
+        self.result = result
+        self.elapsed = elapsed
+        self.cpu_time = cpu_time
+        self.details = details
+        self.prepare_time = None
+        self.peak_rss = None
+        self.peak_traced = None
+
+    def __repr__(self):
+        return "Execution(reason={!r}, result={!r}, elapsed={!r})".format(
+            self.reason, self.result, self.elapsed)
+
+    @property
+    def returned(self):
+        return self.reason in ("finished", "overtime")
+
+    @property
+    def timed_out(self):
+        return self.reason in ("timeout", "overtime")
+
+    def time(self, clock="wall"):
+        """
+        Returns the duration of the solver on the given clock ("wall"
+        or "cpu")
+        """
+        return self.cpu_time if clock == "cpu" else self.elapsed
+
+
+class Timer(object):
+    """
+    Context manager measuring the wall and CPU time of its block, with
+    the garbage collector disabled if asked (its pauses land on whatever
+    code happens to allocate, adding noise to the timings)
+    """
+
+    def __init__(self, disable_gc=False):
+        self.disable_gc = disable_gc
+        self.elapsed = self.cpu_time = None
+        self._gc_was_enabled = False
+        self._wall = self._cpu = None
+
+    def __enter__(self):
+        if self.disable_gc:
+            self._gc_was_enabled = gc.isenabled()
+            gc.disable()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self._wall
+        self.cpu_time = time.process_time() - self._cpu
+        if self._gc_was_enabled:
+            gc.enable()
+
+
+# Clock: (signal, timer) interrupting the solver at the time limit
+ALARMS = {
+    "wall": ("SIGALRM", "ITIMER_REAL"),
+    "cpu": ("SIGPROF", "ITIMER_PROF"),
+}
+
+
+def finish(result, timer, time_limit, clock="wall"):
+    real = Execution("finished", result=result, elapsed=timer.elapsed,
+                     cpu_time=timer.cpu_time)
+    if real.time(clock) > time_limit:
+        real.reason = "overtime"
+    return real
+
+
+def run_in_process(func, time_limit, use_signal=True, clock="wall",
+                   disable_gc=False):
+    """
+    Runs func in the current process. With use_signal, a signal
+    interrupts it at the time limit (of the given clock). This is only
+    possible from the main thread, and otherwise the timeout is detected
+    once func returns.
+    Exceptions raised by func are propagated.
+    """
+    signal_name, timer_name = ALARMS[clock]
+    use_signal = (use_signal and hasattr(signal, signal_name) and
+                  threading.current_thread() is threading.main_thread())
+
+    def handler(signum, frame):  # pylint: disable=unused-argument
+        raise TimeoutError()
+
+    timer = Timer(disable_gc=disable_gc)
+    try:
+        if use_signal:
+            old_handler = signal.signal(getattr(signal, signal_name), handler)
+            signal.setitimer(getattr(signal, timer_name), time_limit)
+        with timer:
+            result = func()
+    except TimeoutError:
+        return Execution("timeout", elapsed=timer.elapsed,
+                         cpu_time=timer.cpu_time)
+    finally:
+        if use_signal:
+            signal.setitimer(getattr(signal, timer_name), 0)
+            signal.signal(getattr(signal, signal_name), old_handler)
+
+    return finish(result, timer, time_limit, clock)
+
+
+def pin_cpus(cpus):
+    """
+    Restricts the current process (and its future children) to the
+    given CPUs, where the OS allows it. Returns whether it did.
+    """
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return False
+    os.sched_setaffinity(0, cpus)
+    return True
+
+
+@contextlib.contextmanager
+def pinned_cpus(cpus):
+    """
+    Pins the current process to the given CPUs (see pin_cpus) for the
+    duration of the block, then gives it back its previous CPUs
+    """
+    previous = None
+    if cpus and hasattr(os, "sched_getaffinity"):
+        previous = os.sched_getaffinity(0)
+    pin_cpus(cpus)
+    try:
+        yield
+    finally:
+        if previous is not None:
+            os.sched_setaffinity(0, previous)
+
+
+def limit_memory(memory_limit):
+    """
+    Limits the address space of the current process to memory_limit bytes
+    """
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def peak_rss():
+    """
+    Returns the peak resident memory of the current process, in bytes
+    """
+    # Linux keeps ru_maxrss across fork and exec, so a child would report
+    # the peak of its parent: the high-water mark of the process's own
+    # memory is in /proc
+    try:
+        with open("/proc/self/status") as handler:
+            for line in handler:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except IOError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux counts in kilobytes, macOS in bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_child(problem_class, method_name, connection, memory_limit=None,
+              trace_memory=False, time_limit=None, clock="wall",
+              disable_gc=False, cpus=None):
+    """
+    Entry point of the child process: calls the given method on a new
+    instance of problem_class and sends the Execution to the parent.
+    With a time limit, the child interrupts the solver itself at the
+    limit (which the parent can't do on the CPU clock).
+    """
+    pin_cpus(cpus)
+    if memory_limit is not None and resource is not None:
+        limit_memory(memory_limit)
+    # Starting the interpreter is not part of the solver's time
+    connection.send(READY)
+    if trace_memory:
+        tracemalloc.start()
+
+    prepare_time = None
+    try:
+        try:
+            problem = problem_class(method_name)
+            if hasattr(problem, "run_prepare"):
+                prepare_time = problem.run_prepare()
+            outcome = run_in_process(
+                getattr(problem, method_name),
+                float("inf") if time_limit is None else time_limit,
+                use_signal=time_limit is not None, clock=clock,
+                disable_gc=disable_gc)
+        except MemoryError:
+            outcome = Execution("out_of_memory",
+                                details=traceback.format_exc())
+
+        outcome.prepare_time = prepare_time
+        outcome.peak_rss = peak_rss()
+        if trace_memory:
+            outcome.peak_traced = tracemalloc.get_traced_memory()[1]
+        connection.send(outcome)
+    except Exception:  # pylint: disable=broad-except
+        connection.send(Execution("error", details=traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+# How many times the time limit a child process limited on the CPU clock
+# may run (in wall time) before being killed
+WALL_GRACE = 3
+# Seconds a child process may take to start (importing the problem)
+STARTUP_TIMEOUT = 60
+# Sent by the child process once it is about to run the solver
+READY = "ready"
+
+
+def stop_process(process):
+    if process.is_alive():
+        process.terminate()
+    process.join()
+
+
+def run_isolated(problem_class, method_name="solve_real", time_limit=60,
+                 memory_limit=None, trace_memory=False, clock="wall",
+                 disable_gc=False, cpus=None):
+    """
+    Runs problem_class().method_name() in a child process, which is
+    killed if it has not returned after time_limit seconds. The memory
+    of the child process can be limited to memory_limit bytes (where
+    the resource module is available).
+    On the CPU clock, the child interrupts itself at the time limit, and
+    is only killed after wall_grace times the limit (in case it is stuck
+    in C code, or waiting). The child alone is pinned to the given cpus.
+    The child starts from a new interpreter, so problem_class must be
+    importable, and its memory (limit and peak) only covers the solver.
+    """
+    import multiprocessing  # Only needed (and loaded) in isolated mode
+
+    # A forked child would inherit the memory of the runner: its peak RSS
+    # and its share of the memory limit. A spawned one starts clean, and
+    # imports the problem module again.
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=run_child,
+        args=(problem_class, method_name, sender, memory_limit, trace_memory,
+              time_limit, clock, disable_gc, cpus))
+    wall_limit = time_limit * (WALL_GRACE if clock == "cpu" else 1)
+
+    process.start()
+    sender.close()
+    before = time.perf_counter()
+    try:
+        try:
+            if not receiver.poll(STARTUP_TIMEOUT):
+                return Execution(
+                    "crashed", details="Solver process did not start")
+            receiver.recv()
+            before = time.perf_counter()
+            if not receiver.poll(wall_limit):
+                return Execution("timeout",
+                                 elapsed=time.perf_counter() - before)
+            outcome = receiver.recv()
+        except EOFError:
+            process.join()
+            return Execution(
+                "crashed", elapsed=time.perf_counter() - before,
+                details="Solver process exited with code {}".format(
+                    process.exitcode))
+    finally:
+        receiver.close()
+        stop_process(process)
+
+    return outcome
@@ -0,0 +1,150 @@
+"""
+Remembers which tests passed for which version of each problem, so that
+problems that did not change since can be skipped.
+
+The version of a problem is a fingerprint of its file, of the local
+modules it imports (transitively) and of pyler's own sources.
+"""
+import ast
+import hashlib
+import os
+
+from . import utils
+
+RESULTS_FILE = os.path.join(".pyler", "results.json")
+
+_pyler_files = None
+
+
+def python_files(directory):
+    return sorted(
+        os.path.join(dirpath, file_name)
+        for dirpath, __, file_names in os.walk(directory)
+        for file_name in file_names
+        if file_name.endswith(".py"))
+
+
+def pyler_files():
+    global _pyler_files  # pylint: disable=global-statement
+    if _pyler_files is None:
+        _pyler_files = python_files(os.path.dirname(__file__))
+    return _pyler_files
+
+
+def imported_modules(source):
+    """
+    Returns the top-level names of the modules imported in source
+    """
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level == 0 and node.module:
+                names.add(node.module.split(".")[0])
+    return names
+
+
+def local_module_files(path, name):
+    """
+    Returns the files of the module `name` if it lives in path
+    """
+    module_file = os.path.join(path, name + ".py")
+    if os.path.isfile(module_file):
+        return [module_file]
+
+    package = os.path.join(path, name)
+    if os.path.isfile(os.path.join(package, "__init__.py")):
+        return python_files(package)
+    return []
+
+
+def problem_files(path, file_name):
+    """
+    Returns the problem file and the local modules it depends on
+    """
+    seen = set()
+    to_visit = [os.path.join(path, file_name)]
+    while to_visit:
+        file_path = to_visit.pop()
+        if file_path in seen:
+            continue
+        seen.add(file_path)
+
+        with open(file_path, "rb") as handler:
+            source = handler.read()
+        try:
+            names = imported_modules(source)
+        except SyntaxError:
+            continue
+        for name in names:
+            to_visit.extend(local_module_files(path, name))
+
+    return sorted(seen)
+
+
+def fingerprint(path, file_name, extra=""):
+    """
+    Hashes the problem file, its local dependencies, pyler's sources and
+    any extra string (e.g. the options of the run)
+    """
+    digest = hashlib.sha256(extra.encode("utf-8"))
+    files = [(os.path.relpath(file_path, path), file_path)
+             for file_path in problem_files(path, file_name)]
+    files += [("pyler:" + os.path.basename(file_path), file_path)
+              for file_path in pyler_files()]
+
+    for name, file_path in files:
+        digest.update(name.encode("utf-8"))
+        with open(file_path, "rb") as handler:
+            digest.update(hashlib.sha256(handler.read()).digest())
+    return digest.hexdigest()
+
+
+class Results(object):
+    """
+    The tests that last passed for each problem, along with the
+    fingerprint of the problem at the time.
+    """
+
+    def __init__(self, path):
+        self.file_path = os.path.join(path, RESULTS_FILE)
+        self.results = utils.load_json(self.file_path, default={})
+
+    def is_fresh(self, problem, problem_fingerprint, tests):
+        """
+        Tells whether all the given tests passed for this very
+        version of the problem
+        """
+        entry = self.results.get(problem)
+        return bool(entry and entry["fingerprint"] == problem_fingerprint
+                    and set(tests) <= set(entry["passed"]))
+
+    def update(self, fingerprints, records):
+        """
+        Stores the outcomes of the records, given the fingerprint
+        of each problem.
+        """
+        for problem, problem_fingerprint in fingerprints.items():
+            entry = self.results.get(problem)
+            passed = set()
+            if entry and entry["fingerprint"] == problem_fingerprint:
+                passed = set(entry["passed"])
+
+            for record in records:
+                if record["problem"] != problem:
+                    continue
+                test = record["id"].split(".")[-1]
+                # A skipped test is skipped again until the problem changes
+                if record["outcome"] in ("success", "skipped"):
+                    passed.add(test)
+                else:
+                    passed.discard(test)
+
+            self.results[problem] = {
+                "fingerprint": problem_fingerprint,
+                "passed": sorted(passed),
+            }
+
+    def save(self):
+        utils.dump_json(self.file_path, self.results)
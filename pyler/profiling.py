@@ -0,0 +1,77 @@
+"""
+Profiles a solver with cProfile and, optionally, tracemalloc, calling it
+directly so that the unittest machinery stays out of the profile.
+"""
+import cProfile
+import os
+import pstats
+import tracemalloc
+
+from . import utils
+
+PROFILES_DIR = os.path.join(".pyler", "profiles")
+
+
+def profile(problem_class, method_name="solve_real", memory=False):
+    """
+    Calls the given method of a new problem instance under cProfile,
+    and returns the profiler, the tracemalloc snapshot taken at the
+    end of the call and the peak of traced memory during the call
+    (both None without memory).
+    The snapshot only shows the memory still held once the method has
+    returned: what the solver allocated and freed only counts in the
+    peak.
+    """
+    problem = problem_class(method_name)
+    profiler = cProfile.Profile()
+    snapshot = peak = None
+
+    if memory:
+        tracemalloc.start()
+    try:
+        profiler.enable()
+        try:
+            getattr(problem, method_name)()
+        finally:
+            profiler.disable()
+        if memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__)])
+    finally:
+        if memory:
+            tracemalloc.stop()
+
+    return profiler, snapshot, peak
+
+
+def save(path, name, profiler, snapshot=None):
+    """
+    Stores the profile (and the snapshot) in the profiles folder of path
+    and returns the names of the written files.
+    """
+    directory = os.path.join(path, PROFILES_DIR)
+    os.makedirs(directory, exist_ok=True)
+
+    file_names = [os.path.join(directory, name + ".pstats")]
+    profiler.dump_stats(file_names[0])
+    if snapshot is not None:
+        file_names.append(os.path.join(directory, name + ".snapshot"))
+        snapshot.dump(file_names[1])
+    return file_names
+
+
+def write_report(stream, profiler, snapshot=None, top=20, sort="cumulative",
+                 peak=None):
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(sort).print_stats(top)
+
+    if peak is not None:
+        stream.write("Peak of traced memory: {}\n".format(
+            utils.format_size(peak)))
+    if snapshot is not None:
+        stream.write("Top {} allocation sites still held at the end:\n"
+                     "".format(top))
+        for stat in snapshot.statistics("lineno")[:top]:
+            stream.write("{}\n".format(stat))
@@ -0,0 +1,128 @@
+"""
+Machine-readable reports of a test run (JSON or JUnit XML), with the
+outcome and the measurements of every problem.
+"""
+import json
+import xml.etree.ElementTree as ElementTree
+
+from . import runner
+
+# From the best to the worst, the outcome of a problem being the worst
+# outcome of its tests (skipped tests only count when no test ran)
+OUTCOMES = ["success", "expected_failure", "skipped", "pending",
+            "unexpected_success", "failure", "error"]
+
+# Outcome: JUnit element
+JUNIT_ELEMENTS = {
+    "failure": "failure",
+    "unexpected_success": "failure",
+    "error": "error",
+    "skipped": "skipped",
+    "pending": "skipped",
+}
+
+
+def group_records(records):
+    """
+    Returns the records as a sorted list of (problem, records of the
+    problem)
+    """
+    problems = {}
+    for record in records:
+        problems.setdefault(record["problem"], []).append(record)
+    return sorted(
+        (problem, sorted(problem_records, key=lambda record: record["id"]))
+        for problem, problem_records in problems.items())
+
+
+def short_name(record):
+    return record["id"].split(".")[-1]
+
+
+def problem_outcome(problem_records):
+    outcomes = {record["outcome"] for record in problem_records}
+    if outcomes != {"skipped"}:
+        outcomes.discard("skipped")
+    return max(outcomes, key=OUTCOMES.index)
+
+
+def problem_entry(problem, problem_records):
+    measurements = runner.problem_measurements(problem_records)[problem]
+    return {
+        "problem": problem,
+        "outcome": problem_outcome(problem_records),
+        "duration": runner.problem_durations(problem_records)[problem],
+        "solve_time": measurements.get("elapsed"),
+        "cpu_time": measurements.get("cpu_time"),
+        "prepare_time": measurements.get("prepare_time"),
+        "peak_rss": measurements.get("peak_rss"),
+        "peak_traced": measurements.get("peak_traced"),
+        "answer_source": measurements.get("answer_source"),
+        "tests": [{
+            "name": short_name(record),
+            "outcome": record["outcome"],
+            "duration": record["duration"],
+            "details": record["details"],
+        } for record in problem_records],
+    }
+
+
+def to_json(records):
+    return json.dumps({
+        "successful": runner.was_successful(records),
+        "problems": [problem_entry(problem, problem_records)
+                     for problem, problem_records in group_records(records)],
+    }, indent=2, sort_keys=True)
+
+
+def to_junit(records):
+    """
+    One testsuite per problem, its measurements being the properties
+    of the testsuite
+    """
+    root = ElementTree.Element("testsuites")
+    for problem, problem_records in group_records(records):
+        entry = problem_entry(problem, problem_records)
+        suite = ElementTree.SubElement(root, "testsuite", {
+            "name": problem,
+            "tests": str(len(problem_records)),
+            "time": "{:.6f}".format(entry["duration"]),
+        })
+        for element, attribute in [("failure", "failures"),
+                                   ("error", "errors"),
+                                   ("skipped", "skipped")]:
+            suite.set(attribute, str(sum(
+                1 for record in problem_records
+                if JUNIT_ELEMENTS.get(record["outcome"]) == element)))
+
+        properties = ElementTree.SubElement(suite, "properties")
+        for name in ("solve_time", "cpu_time", "prepare_time", "peak_rss",
+                     "peak_traced", "answer_source"):
+            if entry[name] is not None:
+                ElementTree.SubElement(properties, "property", {
+                    "name": name, "value": str(entry[name])})
+
+        for record in problem_records:
+            case = ElementTree.SubElement(suite, "testcase", {
+                "classname": problem,
+                "name": short_name(record),
+                "time": "{:.6f}".format(record["duration"] or 0.),
+            })
+            element = JUNIT_ELEMENTS.get(record["outcome"])
+            if element:
+                child = ElementTree.SubElement(case, element, {
+                    "message": record["outcome"]})
+                child.text = record["details"]
+
+    return ElementTree.tostring(root, encoding="unicode")
+
+
+def write(records, report_format, output):
+    """
+    Writes the report of the records in the given format to the output
+    file
+    """
+    content = to_json(records) if report_format == "json" else to_junit(
+        records)
+    with open(output, "w") as handler:
+        handler.write(content + "\n")
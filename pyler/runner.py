@@ -0,0 +1,366 @@
+"""
+Runs the problems' test cases, possibly across several worker processes,
+and merges their outcomes into a single report.
+"""
+import collections
+import concurrent.futures
+import importlib
+import sys
+import time
+import unittest
+
+from . import utils
+from .euler_test_base import EulerProblem
+
+SEPARATOR_BOLD = "=" * 70
+SEPARATOR = "-" * 70
+
+SYMBOLS = {
+    "success": ".",
+    "failure": "F",
+    "error": "E",
+    "skipped": "s",
+    "pending": "p",
+    "expected_failure": "x",
+    "unexpected_success": "u",
+}
+
+
+class RecordingResult(unittest.TestResult):
+    """
+    TestResult keeping a picklable record (a dict) of every outcome,
+    so that it can be sent back from a worker process.
+    """
+
+    def __init__(self, problem=None, tests_names=()):
+        super().__init__()
+        self.problem = problem
+        self.tests_names = list(tests_names)
+        self.records = []
+        self._started = None
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started = time.time()
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self._started = None
+
+    def test_ids(self, test):
+        """
+        Returns the ids of the tests an outcome stands for. Outcomes of
+        class or module fixtures come with a description such as
+        "setUpClass (problem_0004.Problem0004)" instead of a test: a
+        setUpClass outcome (e.g. the skip of a problem that is not
+        implemented) stands for every test of the class.
+        """
+        if isinstance(test, unittest.TestCase):
+            return [test.id()]
+
+        fixture, __, location = test.id().partition(" ")
+        location = location.strip("()")
+        if fixture == "setUpClass":
+            tests_ids = [name for name in self.tests_names
+                         if name.startswith(location + ".")]
+            if tests_ids:
+                return tests_ids
+        return ["{}.{}".format(location, fixture)]
+
+    def _record(self, test, outcome, details=""):
+        duration = None
+        if self._started is not None:
+            duration = time.time() - self._started
+        for test_id in self.test_ids(test):
+            self.records.append({
+                "id": test_id,
+                "problem": self.problem,
+                "outcome": outcome,
+                "details": details,
+                "duration": duration,
+                "measurements": dict(getattr(test, "measurements", {})),
+            })
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._record(test, "success")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record(test, "failure", self.failures[-1][1])
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._record(test, "error", self.errors[-1][1])
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        outcome = "skipped"
+        if getattr(test, "submission_pending", False):
+            outcome = "pending"
+        self._record(test, outcome, reason)
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self._record(test, "expected_failure", self.expectedFailures[-1][1])
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self._record(test, "unexpected_success")
+
+
+def problem_name(tests_names):
+    """
+    Returns the module name shared by the given test names
+    """
+    return tests_names[0].split(".")[0]
+
+
+def setup_worker(path, overrides):
+    """
+    Makes the problem files importable and applies the attributes in
+    overrides to EulerProblem (e.g. {"isolated": True})
+    """
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    for name, value in overrides.items():
+        setattr(EulerProblem, name, value)
+
+
+def load_problem(problem, path=None):
+    """
+    Returns the test case class of a problem module (e.g. "problem_0001")
+    """
+    if path is not None:
+        setup_worker(path, {})
+    module = importlib.import_module(problem)
+    return getattr(module, "Problem" + problem[-4:])
+
+
+class LoadFailure(unittest.TestCase):
+    """
+    Stands for the tests of a problem that could not be loaded, and
+    reports the error.
+    """
+
+    def __init__(self, problem, error):
+        super().__init__()
+        self.problem = problem
+        self.error = error
+
+    def id(self):
+        return "{}.load".format(self.problem)
+
+    def runTest(self):
+        raise self.error
+
+
+class WorkerCrash(LoadFailure):
+    """
+    Stands for a test whose worker process died (segfault, out of
+    memory kill...) while running its problem, and reports the error.
+    """
+
+    def __init__(self, test_name, error):
+        super().__init__(problem_name([test_name]), error)
+        self.test_name = test_name
+
+    def id(self):
+        return self.test_name
+
+
+def crash_records(tests_names, error):
+    """
+    Returns the records of the given tests of a problem whose worker
+    process died
+    """
+    result = RecordingResult(problem=problem_name(tests_names))
+    unittest.TestSuite(
+        WorkerCrash(name, error) for name in tests_names).run(result)
+    return result.records
+
+
+def load_tests(tests_names):
+    """
+    Builds the suite of the given tests of a problem, importing its
+    module directly rather than through unittest's name resolution.
+    """
+    module_name, class_name, __ = tests_names[0].split(".")
+    problem_class = getattr(importlib.import_module(module_name), class_name)
+    return unittest.TestSuite(
+        problem_class(name.split(".")[-1]) for name in tests_names)
+
+
+def run_problem(tests_names, path=None, overrides=None):
+    """
+    Runs the given tests (all belonging to the same problem) and
+    returns the records of their outcomes.
+    """
+    if path is not None:
+        setup_worker(path, overrides or {})
+    result = RecordingResult(problem=problem_name(tests_names),
+                             tests_names=tests_names)
+    try:
+        suite = load_tests(tests_names)
+    except Exception as exc:  # pylint: disable=broad-except
+        suite = unittest.TestSuite([LoadFailure(result.problem, exc)])
+    suite.run(result)
+    return result.records
+
+
+def iter_results(groups, path, jobs, overrides):
+    """
+    Yields the records of each group of tests, as they complete. With
+    more than one job, groups run in a pool of processes.
+    """
+    if jobs == 1:
+        for group in groups:
+            yield run_problem(group, path, overrides)
+        return
+
+    # Unlike multiprocessing.Pool's, these workers are not daemonic, so
+    # they can start isolated solver processes themselves. The groups are
+    # picked in order by the free workers, so put the longest first.
+    groups = collections.deque(groups)
+    while groups:
+        suspects = []
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            # Only `jobs` groups are in flight, so that a worker dying
+            # only takes down the groups that were actually running
+            running = {}
+            try:
+                while groups or running:
+                    while groups and len(running) < jobs:
+                        group = groups.popleft()
+                        running[pool.submit(
+                            run_problem, group, path, overrides)] = group
+                    done, __ = concurrent.futures.wait(
+                        running,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        records = future.result()
+                        del running[future]
+                        yield records
+            except concurrent.futures.BrokenExecutor:
+                suspects = list(running.values())
+
+        # Running each suspect alone tells the culprit from the groups it
+        # took down, then the other groups go on in a new pool
+        for group in suspects:
+            yield run_alone(group, path, overrides)
+
+
+def run_alone(group, path, overrides):
+    """
+    Runs a group of tests in a worker process of its own, and returns
+    its records, or error records if the worker died
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as pool:
+        try:
+            return pool.submit(run_problem, group, path, overrides).result()
+        except concurrent.futures.BrokenExecutor as exc:
+            return crash_records(group, exc)
+
+
+def run_groups(groups, path, jobs, overrides=None, stream=sys.stderr):
+    """
+    Runs each group of tests names (one group per problem) in `jobs`
+    processes, prints a unittest-like report on `stream` and returns
+    the list of records.
+    """
+    before = time.time()
+    records = []
+
+    for problem_records in iter_results(groups, path, jobs, overrides):
+        for record in problem_records:
+            stream.write(SYMBOLS[record["outcome"]])
+        stream.flush()
+        records.extend(problem_records)
+
+    write_report(records, time.time() - before, stream)
+    return records
+
+
+def was_successful(records):
+    return not any(
+        record["outcome"] in ("failure", "error", "unexpected_success")
+        for record in records)
+
+
+def problem_durations(records):
+    """
+    Returns a dict {problem: total duration of its tests}
+    """
+    durations = {}
+    for record in records:
+        durations.setdefault(record["problem"], 0.)
+        durations[record["problem"]] += record["duration"] or 0.
+    return durations
+
+
+def problem_measurements(records):
+    """
+    Returns a dict {problem: measurements of its tests (elapsed, peak_rss,
+    peak_traced...) merged together}
+    """
+    measurements = {}
+    for record in records:
+        measurements.setdefault(record["problem"], {}).update(
+            record.get("measurements") or {})
+    return measurements
+
+
+def format_measure(value, formatter):
+    return "-" if value is None else formatter(value)
+
+
+def write_report(records, elapsed, stream):
+    stream.write("\n")
+
+    records = sorted(records, key=lambda record: record["id"])
+    for outcome, label in [("error", "ERROR"), ("failure", "FAIL")]:
+        for record in records:
+            if record["outcome"] != outcome:
+                continue
+            stream.write("{}\n{}: {}\n{}\n{}\n".format(
+                SEPARATOR_BOLD, label, record["id"], SEPARATOR,
+                record["details"]))
+
+    durations = problem_durations(records)
+    measurements = problem_measurements(records)
+    if durations:
+        stream.write("{}\n{:<14}{:>11}{:>11}{:>11}{:>11}{:>12}{:>12}\n".format(
+            SEPARATOR, "problem", "tests", "prepare", "solve", "cpu",
+            "peak RSS", "traced"))
+        for problem, duration in sorted(
+                durations.items(), key=lambda item: item[1], reverse=True):
+            measures = measurements[problem]
+            stream.write(
+                "{:<14}{:>10.3f}s{:>11}{:>11}{:>11}{:>12}{:>12}\n".format(
+                    problem, duration,
+                    format_measure(measures.get("prepare_time"),
+                                   "{:.3f}s".format),
+                    format_measure(measures.get("elapsed"), "{:.3f}s".format),
+                    format_measure(measures.get("cpu_time"),
+                                   "{:.3f}s".format),
+                    format_measure(measures.get("peak_rss"),
+                                   utils.format_size),
+                    format_measure(measures.get("peak_traced"),
+                                   utils.format_size)))
+
+    stream.write("{}\nRan {} test{} in {:.3f}s\n\n".format(
+        SEPARATOR, len(records), "" if len(records) == 1 else "s", elapsed))
+
+    counts = [
+        "{}={}".format(name, sum(1 for record in records
+                                 if record["outcome"] == outcome))
+        for outcome, name in [("failure", "failures"), ("error", "errors"),
+                              ("skipped", "skipped"), ("pending", "pending")]
+        if any(record["outcome"] == outcome for record in records)]
+
+    status = "OK" if was_successful(records) else "FAILED"
+    if counts:
+        status += " ({})".format(", ".join(counts))
+    stream.write(status + "\n")
+    if any(record["outcome"] == "pending" for record in records):
+        stream.write("Run `pyler submit` to check the pending answers\n")
@@ -0,0 +1,89 @@
+"""
+Estimates how a solver scales: times it over inputs of increasing size,
+fits time = constant * size ** exponent (a straight line in log-log
+space), and projects the time the real input will take.
+"""
+import math
+
+from . import execution
+
+HEADER = "{:>14}{:>12}".format("size", "time")
+
+# Each input is solved repeatedly for at least this many seconds (and at
+# least once), keeping the fastest run
+MIN_TOTAL_TIME = .2
+MAX_RUNS = 10
+
+
+def time_solver(problem, input_val, disable_gc=False):
+    """
+    Returns the fastest duration of the solver on the given input
+    """
+    timings = []
+    while not timings or (sum(timings) < MIN_TOTAL_TIME and
+                          len(timings) < MAX_RUNS):
+        with execution.Timer(disable_gc=disable_gc) as timer:
+            problem.solver(input_val)
+        timings.append(timer.elapsed)
+    return min(timings)
+
+
+def measure(problem_class):
+    """
+    Returns the (size, duration) of each of the scaling inputs of the
+    problem
+    """
+    problem = problem_class("solve_real")
+    problem.run_prepare()
+    return [(problem.input_size(input_val), time_solver(problem, input_val))
+            for input_val in problem_class.scaling_inputs]
+
+
+class Fit(object):
+    """
+    Least squares fit of log(duration) = log(constant) + exponent *
+    log(size). r_squared tells how well the points follow the model.
+    """
+
+    def __init__(self, points):
+        points = [(math.log(size), math.log(duration))
+                  for size, duration in points if size > 0 and duration > 0]
+        if len({x for x, __ in points}) < 2:
+            raise ValueError("At least 2 distinct positive sizes are needed")
+
+        count = len(points)
+        mean_x = sum(x for x, __ in points) / count
+        mean_y = sum(y for __, y in points) / count
+        variance_x = sum((x - mean_x) ** 2 for x, __ in points)
+        covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+
+        self.exponent = covariance / variance_x
+        self.log_constant = mean_y - self.exponent * mean_x
+
+        residuals = sum((y - self.log_constant - self.exponent * x) ** 2
+                        for x, y in points)
+        total = sum((y - mean_y) ** 2 for __, y in points)
+        self.r_squared = 1 - residuals / total if total else 1.
+
+    def project(self, size):
+        """
+        Returns the estimated duration for an input of this size
+        """
+        return math.exp(self.log_constant) * size ** self.exponent
+
+
+def format_row(size, duration):
+    return "{:>14}{:>11.4f}s".format(size, duration)
+
+
+def format_estimate(fit, real_size, time_limit):
+    lines = ["Estimated complexity: O(n^{:.2f}) (r^2 = {:.3f})".format(
+        fit.exponent, fit.r_squared)]
+    if real_size is not None:
+        projected = fit.project(real_size)
+        line = "Projected time for the real input (size {}): {:.3g}s".format(
+            real_size, projected)
+        if projected > time_limit:
+            line += " OVER THE {}s LIMIT".format(time_limit)
+        lines.append(line)
+    return "\n".join(lines)
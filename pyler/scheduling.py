@@ -0,0 +1,98 @@
+"""
+Orders the problems longest first, so that the parallel workers all
+finish around the same time (longest processing time first).
+
+The durations of the previous runs are kept per problem, split between
+the real solver (shared by the real, time and memory tests) and the
+simple test, so that estimates hold whatever tests are run.
+"""
+import os
+import statistics
+
+from . import runner
+from . import utils
+
+DURATIONS_FILE = os.path.join(".pyler", "durations.json")
+
+# Weight of the last run in the stored durations
+SMOOTHING = .5
+# Estimated duration of a problem when no problem has any history
+DEFAULT_DURATION = 1.
+
+SOLVE_TESTS = {"test_real", "test_time", "test_memory"}
+
+
+class Durations(object):
+    """
+    The durations of the previous runs: {problem: {"solve": seconds,
+    "simple": seconds}}
+    """
+
+    def __init__(self, path):
+        self.file_path = os.path.join(path, DURATIONS_FILE)
+        self.durations = utils.load_json(self.file_path, default={})
+
+    def known_estimate(self, problem, tests):
+        entry = self.durations.get(problem)
+        if not entry:
+            return None
+        estimate = 0.
+        if tests & SOLVE_TESTS:
+            estimate += entry.get("solve", 0.)
+        if "test_simple" in tests:
+            estimate += entry.get("simple", 0.)
+        return estimate
+
+    def schedule(self, groups):
+        """
+        Returns the groups of tests names (one group per problem) sorted
+        by decreasing estimated duration. Problems without history are
+        estimated at the median of the others, the higher problem ids
+        (that tend to be harder) coming first.
+        """
+        estimates = {}
+        for group in groups:
+            problem = runner.problem_name(group)
+            estimates[problem] = self.known_estimate(
+                problem, {name.split(".")[-1] for name in group})
+
+        known = [value for value in estimates.values() if value is not None]
+        default = statistics.median(known) if known else DEFAULT_DURATION
+
+        def key(group):
+            problem = runner.problem_name(group)
+            estimate = estimates[problem]
+            return (default if estimate is None else estimate), problem
+
+        return sorted(groups, key=key, reverse=True)
+
+    def update(self, records):
+        """
+        Blends the durations measured in the records into the history
+        """
+        measurements = runner.problem_measurements(records)
+        latest = {}
+        for record in records:
+            # Skipped tests and errors say nothing of the duration
+            if record["outcome"] not in ("success", "failure"):
+                continue
+            problem = record["problem"]
+            measures = measurements[problem]
+            test = record["id"].split(".")[-1]
+            if test == "test_simple":
+                latest.setdefault(problem, {})["simple"] = (
+                    record["duration"] or 0.)
+            elif test in SOLVE_TESTS and "elapsed" in measures:
+                latest.setdefault(problem, {})["solve"] = (
+                    measures["elapsed"] + measures.get("prepare_time", 0.))
+
+        for problem, parts in latest.items():
+            entry = self.durations.setdefault(problem, {})
+            for part, duration in parts.items():
+                if part in entry:
+                    duration = (SMOOTHING * duration +
+                                (1 - SMOOTHING) * entry[part])
+                entry[part] = duration
+
+    def save(self):
+        utils.dump_json(self.file_path, self.durations)
@@ -0,0 +1,122 @@
+"""
+Sends the requests to the website: each one with a timeout, throttled by
+a token bucket, and sent again with an exponential backoff when it fails
+for a reason that is likely to go away.
+"""
+import collections
+import itertools
+import threading
+import time
+
+import requests
+
+# The server could not answer this time
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+# The server refused the request without processing it
+REFUSED_STATUSES = {429, 503}
+# Methods that may be sent twice without side effects
+IDEMPOTENT_METHODS = {"get", "head"}
+
+
+class TokenBucket(object):
+    """
+    Lets through `rate` requests per second on average, and bursts of
+    up to `burst` requests. A rate of 0 means no limit.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a token is available and takes it. Returns the time
+        spent waiting, in seconds.
+        """
+        if not self.rate:
+            return 0.
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Taking the token right away (possibly going negative) books
+            # our turn, so that we can sleep without holding the lock
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.
+
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class Transport(object):
+    """
+    Sends the requests of a session. The stats count the requests sent,
+    the retries, and the time spent waiting (for the rate limit or
+    between retries), in seconds.
+    """
+
+    def __init__(self, rate=5., burst=1, timeout=30., retries=3,
+                 backoff=.5, max_backoff=30.):
+        self.bucket = TokenBucket(rate, burst)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stats = collections.Counter()
+        self._stats_lock = threading.Lock()
+
+    def count(self, **amounts):
+        with self._stats_lock:
+            self.stats.update(amounts)
+
+    def should_retry(self, method, response=None, error=None):
+        # A request that may have been processed is only sent again if
+        # it has no side effect (we don't want to submit an answer twice)
+        idempotent = method in IDEMPOTENT_METHODS
+        if error is not None:
+            return idempotent or isinstance(error, requests.ConnectTimeout)
+        if idempotent:
+            return response.status_code in TRANSIENT_STATUSES
+        return response.status_code in REFUSED_STATUSES
+
+    def backoff_delay(self, attempt, response=None):
+        """
+        Returns how long to wait before the next attempt, following the
+        Retry-After header of the response if any
+        """
+        try:
+            delay = float(response.headers["Retry-After"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            delay = self.backoff * 2 ** attempt
+        return min(delay, self.max_backoff)
+
+    def request(self, session, method, url, **kwargs):
+        """
+        Calls session.<method>(url, **kwargs), with the retries and
+        throttling described above. Returns the last response, or raises
+        the last error if no response could be obtained.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in itertools.count():
+            self.count(requests=1, waited=self.bucket.acquire())
+            response = error = None
+            try:
+                response = getattr(session, method)(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = exc
+
+            if (attempt >= self.retries or
+                    not self.should_retry(method, response, error)):
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self.backoff_delay(attempt, response)
+            self.count(retries=1, waited=delay)
+            time.sleep(delay)
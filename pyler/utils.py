@@ -1,7 +1,16 @@
+import contextlib
+import json
+import os
 import subprocess
 import sys
+import tempfile
 import time
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 
 def user_input(*args, **kwargs):
     return input(*args, **kwargs)
@@ -23,3 +32,87 @@ def default_open(something_to_open):
         subprocess.Popen(['start', something_to_open], shell=True)
 
     time.sleep(0.3)
+
+
+def write_atomic(path, content):
+    """
+    Writes the bytes in content to path, through a temporary file, so
+    that readers never see a partially written file.
+    """
+    directory = os.path.dirname(path)
+    handler = tempfile.NamedTemporaryFile(dir=directory or ".", delete=False)
+    try:
+        with handler:
+            handler.write(content)
+        os.replace(handler.name, path)
+    except BaseException:
+        os.remove(handler.name)
+        raise
+
+
+@contextlib.contextmanager
+def locked(path):
+    """
+    Holds an advisory lock on path (through a ".lock" file next to it),
+    where fcntl is available
+    """
+    with open(path + ".lock", "a") as handler:
+        if fcntl is not None:
+            fcntl.flock(handler, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handler, fcntl.LOCK_UN)
+
+
+def load_json(path, default=None):
+    try:
+        with open(path, "r") as handler:
+            return json.load(handler)
+    except (IOError, ValueError):
+        return default
+
+
+def dump_json(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_atomic(path, json.dumps(data, indent=2, sort_keys=True).encode(
+        "utf-8"))
+
+
+def format_size(size):
+    """
+    Formats a number of bytes for humans (e.g. 1.5 GiB)
+    """
+    if size < 1024:
+        return "{} B".format(size)
+    for unit in ("KiB", "MiB", "GiB", "TiB"):
+        size /= 1024.
+        if size < 1024 or unit == "TiB":
+            return "{:.1f} {}".format(size, unit)
+
+
+def parse_size(size):
+    """
+    Reads a number of bytes with an optional K, M or G suffix (powers
+    of 1024), e.g. "512M"
+    """
+    size = size.strip().upper().rstrip("IB") or "0"
+    multiplier = 1
+    if size[-1] in "KMGT":
+        multiplier = 1024 ** ("KMGT".index(size[-1]) + 1)
+        size = size[:-1]
+    return int(float(size) * multiplier)
+
+
+def parse_cpus(cpus):
+    """
+    Reads a set of CPU ids, e.g. "0-3,6"
+    """
+    ids = set()
+    for group in cpus.split(","):
+        bounds = [int(bound) for bound in group.strip().split("-")]
+        ids.update(range(bounds[0], bounds[-1] + 1))
+    return ids
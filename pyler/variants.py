@@ -0,0 +1,128 @@
+"""
+Compares the candidate solvers of a problem (its solver_* methods): checks
+them against the simple output and against each other on the real input,
+then times them in interleaved rounds and ranks them.
+"""
+import math
+import statistics
+
+from . import execution
+
+HEADER = "{:<5}{:<24}{:>6}{:>12}{:>12}{:>20}{:>10}".format(
+    "rank", "solver", "runs", "median", "cpu median", "mean (95% CI)",
+    "vs best")
+
+# Two-sided 95% critical values of Student's t distribution, by degrees
+# of freedom (the normal distribution's 1.96 beyond)
+T_95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262,
+        2.228, 2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101,
+        2.093, 2.086, 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052,
+        2.048, 2.045, 2.042]
+
+
+def check(problem_class):
+    """
+    Runs every variant on the simple and the real input. Returns the
+    real answer of each variant, and the list of the problems found.
+    """
+    problem = problem_class("solve_real")
+    problem.run_prepare()
+    errors = []
+    answers = {}
+    for name in problem_class.candidate_solvers():
+        solver = getattr(problem, name)
+        simple = solver(problem_class.simple_input)
+        if simple != problem_class.simple_output:
+            errors.append("{}: simple input gave {!r} instead of {!r}".format(
+                name, simple, problem_class.simple_output))
+        answers[name] = solver(problem_class.real_input)
+
+    if len(set(map(repr, answers.values()))) > 1:
+        errors.append("The real answers differ: {}".format(", ".join(
+            "{}={!r}".format(name, answer)
+            for name, answer in sorted(answers.items()))))
+    return answers, errors
+
+
+def measure(problem_class, runs, disable_gc=False):
+    """
+    Times every variant on the real input, `runs` times each. Each round
+    runs every variant once, starting with a different one each time, so
+    that drifts of the machine hit all of them alike.
+    Returns {variant name: wall durations} and {variant name: CPU
+    durations}.
+    """
+    problem = problem_class("solve_real")
+    problem.run_prepare()
+    names = problem_class.candidate_solvers()
+    timings = {name: [] for name in names}
+    cpu_timings = {name: [] for name in names}
+
+    for round_index in range(runs):
+        shift = round_index % len(names)
+        for name in names[shift:] + names[:shift]:
+            solver = getattr(problem, name)
+            with execution.Timer(disable_gc=disable_gc) as timer:
+                solver(problem_class.real_input)
+            timings[name].append(timer.elapsed)
+            cpu_timings[name].append(timer.cpu_time)
+    return timings, cpu_timings
+
+
+def confidence_interval(timings):
+    """
+    Returns the mean of the timings and the half width of its 95%
+    confidence interval
+    """
+    mean = statistics.mean(timings)
+    if len(timings) < 2:
+        return mean, float("inf")
+    degrees = len(timings) - 1
+    critical = T_95[degrees - 1] if degrees <= len(T_95) else 1.96
+    return mean, critical * statistics.stdev(timings) / math.sqrt(len(timings))
+
+
+def rank(timings, cpu_timings=None):
+    """
+    Returns a list of entries (dicts) sorted from the fastest variant
+    """
+    entries = []
+    for name, durations in timings.items():
+        mean, half_width = confidence_interval(durations)
+        entries.append({
+            "solver": name,
+            "runs": len(durations),
+            "median": statistics.median(durations),
+            "cpu_median": statistics.median(cpu_timings[name])
+            if cpu_timings else None,
+            "mean": mean,
+            "half_width": half_width,
+        })
+    entries.sort(key=lambda entry: entry["mean"])
+
+    best = entries[0]
+    for entry in entries:
+        entry["ratio"] = entry["mean"] / best["mean"] if best["mean"] else 1.
+        # The intervals overlap: we can't tell which one is faster
+        entry["tied"] = entry is not best and (
+            entry["mean"] - entry["half_width"] <=
+            best["mean"] + best["half_width"])
+    return entries
+
+
+def format_duration(seconds):
+    for unit, scale in (("s", 1.), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return "{:.3g}{}".format(seconds / scale, unit)
+    return "{:.3g}ns".format(seconds * 1e9)
+
+
+def format_row(position, entry):
+    mean = "{} +/- {}".format(format_duration(entry["mean"]),
+                              format_duration(entry["half_width"]))
+    cpu_median = "-" if entry["cpu_median"] is None else format_duration(
+        entry["cpu_median"])
+    return "{:<5}{:<24}{:>6}{:>12}{:>12}{:>20}{:>9.2f}x{}".format(
+        position, entry["solver"], entry["runs"],
+        format_duration(entry["median"]), cpu_median, mean, entry["ratio"],
+        "  (tie)" if entry["tied"] else "")
@@ -0,0 +1,75 @@
+"""
+Watches the problem files, and runs the tests of a problem again as soon
+as its file is saved, in the same interpreter (so that pyler, bs4 and
+the other dependencies are only loaded once).
+"""
+import importlib
+import os
+import sys
+import time
+
+from . import runner
+from .discovery import select_files
+
+TESTS = ["simple", "real", "time"]
+
+
+def snapshot(path, problem_ids=None):
+    """
+    Returns {file name: modification time} of the watched problem files
+    """
+    files = {}
+    for file_name in select_files(problem_ids, path):
+        try:
+            files[file_name] = os.stat(
+                os.path.join(path, file_name)).st_mtime_ns
+        except FileNotFoundError:  # Removed since the folder was scanned
+            continue
+    return files
+
+
+def changed_files(before, after):
+    return sorted(file_name for file_name, mtime in after.items()
+                  if before.get(file_name) != mtime)
+
+
+def tests_names(file_name, tests):
+    module = file_name[:-3]
+    return ["{}.Problem{}.test_{}".format(module, module[-4:], test)
+            for test in sorted(tests)]
+
+
+def rerun(path, file_name, tests, overrides=None, stream=sys.stderr):
+    """
+    Imports the problem module again and runs the given tests
+    """
+    # Only this module is reloaded: the next import reads the new file
+    sys.modules.pop(file_name[:-3], None)
+    importlib.invalidate_caches()
+    return runner.run_groups(
+        [tests_names(file_name, tests)], path=path, jobs=1,
+        overrides=overrides, stream=stream)
+
+
+def watch(path, problem_ids=None, tests=None, interval=.5, overrides=None,
+          stream=sys.stderr):
+    """
+    Polls the problem files every `interval` seconds, until interrupted
+    """
+    path = os.path.abspath(path)
+    tests = tests or TESTS
+    # Saving within the same second with the same size would otherwise
+    # let a stale .pyc file be loaded
+    sys.dont_write_bytecode = True
+
+    known = snapshot(path, problem_ids)
+    stream.write("Watching {} problem file(s) in {}\n".format(
+        len(known), path))
+    while True:
+        time.sleep(interval)
+        current = snapshot(path, problem_ids)
+        for file_name in changed_files(known, current):
+            stream.write("{}\n{} saved at {}\n".format(
+                runner.SEPARATOR_BOLD, file_name, time.strftime("%H:%M:%S")))
+            rerun(path, file_name, tests, overrides, stream)
+        known = current
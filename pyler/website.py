@@ -1,12 +1,19 @@
 import base64
+import collections
+import concurrent.futures
 import pickle
+import re
 import urllib
 import tempfile
+import threading
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import requests
 
+from . import cassette
+from .cache import CachedResponse, HttpCache
 from .config import Config
+from .transport import Transport
 from . import utils
 
 
@@ -14,26 +21,128 @@ class Website(object):
     base_url = "https://projecteuler.net"
     _session = None
     captcha_tries = 3
+    # Maximum number of connections kept open to the website
+    pool_size = 8
+    # Average delay between two requests, in seconds (0 for no limit),
+    # and number of requests that may be sent at once before waiting
+    request_interval = .2
+    request_burst = 3
+    # Seconds before giving up on a response, and attempts after a failure
+    request_timeout = 30.
+    request_retries = 3
+
+    # Only serve pages from the cache, never reach the website
+    offline = False
 
     class NoCredentials(Exception):
         pass
 
+    class NotCached(ValueError):
+        pass
+
+    class NotAccessible(ValueError):
+        """
+        The problem is not published yet
+        """
+
+    def __init__(self):
+        self.http_cache = HttpCache()
+        self.config = Config()
+        self._session_lock = threading.Lock()
+        self.transport = Transport(
+            rate=1 / self.request_interval if self.request_interval else 0,
+            burst=self.request_burst, timeout=self.request_timeout,
+            retries=self.request_retries)
+
+        # (mode, path) of the cassette set up by pyler --record / --replay
+        self.cassette = cassette.from_environment()
+        if self.cassette:
+            # Every response must come from (or go to) the cassette
+            self.http_cache = None
+            if self.cassette[0] == "replay":
+                self.transport.bucket.rate = 0
+
+    def get(self, url, **kwargs):
+        return self.transport.request(self.session, "get", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.transport.request(self.session, "post", url, **kwargs)
+
     @property
     def session(self):
         if not self._session:
-            self._session = requests.Session()
-            config = Config()
-
-            load_session_cookies(config, self._session)
+            # The threads of pyler gen --jobs must share a single session
+            with self._session_lock:
+                if not self._session:
+                    self._session = self.make_session()
 
         return self._session
 
+    def make_session(self):
+        if self.cassette and self.cassette[0] == "replay":
+            session = cassette.ReplaySession(self.cassette[1])
+        else:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        if self.cassette and self.cassette[0] == "record":
+            session = cassette.RecordingSession(session, self.cassette[1])
+        load_session_cookies(self.config, session)
+        return session
+
     def renew_session(self):
         if hasattr(self, "_session"):
             self._session = None
 
-        config = Config()
-        config["session"] = None
+        self.config["session"] = None
+
+
+# Everything we read is below one of these elements: the message, the
+# signs of an expired session or of being logged in, the problem content,
+# the answer row and the submission result.
+PARSED_PARTS = SoupStrainer(id=["message", "about_page", "info_panel",
+                                "content"])
+
+
+class Page(object):
+    """
+    A response that is parsed, only once and only for the parts we
+    read, when its soup is first needed.
+    """
+
+    def __init__(self, response):
+        self.response = response
+        self._soup = None
+
+    @property
+    def content(self):
+        return self.response.content
+
+    @property
+    def url(self):
+        return self.response.url
+
+    @property
+    def status_code(self):
+        return self.response.status_code
+
+    @property
+    def headers(self):
+        return self.response.headers
+
+    @property
+    def from_cache(self):
+        return isinstance(self.response, CachedResponse)
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            self._soup = BeautifulSoup(
+                self.response.content, 'html.parser',
+                parse_only=PARSED_PARTS)
+        return self._soup
 
 
 def get_message(soup):
@@ -45,19 +154,57 @@ def get_message(soup):
 
 def get_problem_content(website, problem_id):
 
-    response = request_get(website, problem_id)
+    response = request_get(website, problem_id, use_cache=True)
     soup = get_soup(response)
 
     message = get_message(soup)
 
     if message == "Problem not accessible":
-        raise ValueError("Cannot access the problem")
+        raise website.NotAccessible("Cannot access the problem")
+
+    # Only accessible problems are cached: the others will be published
+    # long before the cached page expires
+    if (website.http_cache and not response.from_cache and
+            response.status_code == 200):
+        website.http_cache.store(get_url(website, problem_id), response)
 
     return soup.select_one("div.problem_content").get_text().strip()
 
 
+def iter_problem_contents(website, problem_ids, jobs=1):
+    """
+    Yields (problem_id, content) in the order of problem_ids, fetching
+    up to `jobs` problems at once. Stops at the first problem that is
+    not accessible, and raises any other error (such as NotCached).
+    """
+    problem_ids = iter(problem_ids)
+    pending = collections.deque()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        try:
+            while True:
+                for problem_id in problem_ids:
+                    pending.append((problem_id, executor.submit(
+                        get_problem_content, website, problem_id)))
+                    if len(pending) >= jobs:
+                        break
+
+                if not pending:
+                    return
+
+                problem_id, future = pending.popleft()
+                try:
+                    content = future.result()
+                except website.NotAccessible:
+                    return
+                yield problem_id, content
+        finally:
+            for __, future in pending:
+                future.cancel()
+
+
 def connect(website):
-    config = Config()
+    config = website.config
     credentials = config.get_or_ask_for_credentials()
     print(credentials)
     credentials.update({
@@ -102,22 +249,42 @@ def get_url(website, problem_id=None, url_path=None):
 
 def request_get(website, *args, **kwargs):
     """
-    Calls a GET url. Arguments include those of the url method, and
+    Calls a GET url. Arguments include those of the url method,
     needs_connection (True or False) that determine if a Connection
-    will be attempted if we detect the session is no longer valid.
+    will be attempted if we detect the session is no longer valid,
+    and use_cache (True or False) that determine if the page may be
+    read from the website's HTTP cache. Storing a page in the cache is
+    left to the caller, which knows whether it is worth keeping.
+    Returns a Page, so that the response is parsed at most once.
     """
     needs_connection = kwargs.pop("needs_connection", False)
+    use_cache = kwargs.pop("use_cache", False) and website.http_cache
+    url = get_url(website, *args, **kwargs)
 
-    response = website.session.get(get_url(website, *args, **kwargs))
-    soup = get_soup(response)
+    cached = website.http_cache.get(url) if use_cache else None
+    if website.offline or (cached and cached.is_fresh(
+            website.http_cache.ttl)):
+        if not cached:
+            raise website.NotCached("{} is not in the cache".format(url))
+        return Page(cached)
 
-    info_panel = soup.select_one("#about_page")
-    if info_panel:
+    request_kwargs = {"headers": cached.validators()} if cached else {}
+
+    response = website.get(url, **request_kwargs)
+    if cached and response.status_code == 304:
+        website.http_cache.touch(cached)
+        return Page(cached)
+
+    page = Page(response)
+
+    # Looking for the bytes first spares parsing most pages (and images)
+    if b"about_page" in page.content and page.soup.select_one("#about_page"):
         website.renew_session()
         if needs_connection:
             connect(website)
-        response = website.session.get(get_url(website, *args, **kwargs))
-    return response
+        page = Page(website.get(url))
+
+    return page
 
 
 def solve_captcha(website, reason, post_data, url):
@@ -137,7 +304,7 @@ def solve_captcha(website, reason, post_data, url):
 
         post_data["captcha"] = captcha_attempt
 
-        response = website.session.post(url, data=post_data)
+        response = website.post(url, data=post_data)
         soup = get_soup(response)
         message = get_message(soup)
         if message and "confirmation code" in message:
@@ -149,18 +316,23 @@ def solve_captcha(website, reason, post_data, url):
 
 
 def get_soup(response):
-    return BeautifulSoup(response.content, 'html.parser')
+    if not isinstance(response, Page):
+        response = Page(response)
+    return response.soup
 
 
 def check_solution(website, problem_id, solution):
     """
     Check that a solution for a given problem is correct, either
-    by reading the html page if we already cleared it or by
-    submitting it.
+    from the locally known answers, by reading the html page if
+    we already cleared it or by submitting it.
     """
-    soup = get_logged_in_problem_page(website, problem_id)
+    config = website.config
+    good_solution = config.get_answer(problem_id)
+    if good_solution is not None:
+        return good_solution == solution
 
-    good_solution = get_already_found(soup)
+    good_solution = refresh_answer(website, problem_id, config=config)
     if good_solution:
         return good_solution == solution
 
@@ -171,22 +343,77 @@ def check_solution(website, problem_id, solution):
         url=get_url(website, problem_id=problem_id)
     )
 
-    return check_solution_answer(soup)
+    correct = check_solution_answer(soup)
+    if correct:
+        config.set_answer(problem_id, solution)
+    return correct
 
 
-def get_logged_in_problem_page(website, problem_id):
-    response = request_get(website, problem_id)
+def refresh_answer(website, problem_id, config=None):
+    """
+    Reads the answer of a problem from its page and updates the
+    locally known answers. Returns None if the problem is not solved.
+    """
+    config = config or website.config
+    soup = get_logged_in_problem_page(website, problem_id)
+
+    good_solution = get_already_found(soup)
+    if good_solution:
+        config.set_answer(problem_id, good_solution)
+    else:
+        config.forget_answer(problem_id)
+    return good_solution
+
+
+def get_logged_in_page(website, *args, **kwargs):
+    """
+    Returns the soup of a page (same arguments as get_url), connecting
+    first if we are not logged in.
+    """
+    response = request_get(website, *args, **kwargs)
     soup = get_soup(response)
 
     info_panel = soup.select_one("#info_panel > div")
     if not info_panel or "Logged in as" not in info_panel.get_text():
         connect(website)
-        response = request_get(website, problem_id)
+        response = request_get(website, *args, **kwargs)
         soup = get_soup(response)
 
     return soup
 
 
+def get_logged_in_problem_page(website, problem_id):
+    return get_logged_in_page(website, problem_id)
+
+
+def get_progress(soup):
+    """
+    Reads the progress page and returns the set of the solved problem
+    ids and the number of problems.
+    """
+    solved = set()
+    count = 0
+    for link in soup.find_all("a", href=re.compile(r"^problem=\d+$")):
+        problem_id = int(link["href"].split("=")[1])
+        count = max(count, problem_id)
+        if link.find_parent(class_="problem_solved"):
+            solved.add(problem_id)
+
+    return solved, count
+
+
+def sync_progress(website, config=None):
+    """
+    Reads the progress page, in a single request, and stores the number
+    of problems. Returns the set of the solved problem ids.
+    """
+    config = config or website.config
+    solved, count = get_progress(
+        get_logged_in_page(website, url_path="progress"))
+    config.set_progress(count)
+    return solved
+
+
 def check_solution_answer(soup):
     text = soup.select_one("#content").get_text()
 
@@ -0,0 +1,81 @@
+import time
+
+from pyler import EulerProblem
+from pyler import bench
+
+
+def test_percentile():
+    values = list(range(1, 101))
+
+    assert bench.percentile(values, 95) == 95
+    assert bench.percentile(values, 50) == 50
+    assert bench.percentile([3], 95) == 3
+
+
+def test_summarize():
+    summary = bench.summarize([1., 2., 3., 10.])
+
+    assert summary["runs"] == 4
+    assert summary["min"] == 1.
+    assert summary["median"] == 2.5
+    assert summary["p95"] == 10.
+    assert summary["stddev"] > 0
+
+
+def test_history(tmpdir):
+    history = bench.History(str(tmpdir))
+    assert history.baselines() == {}
+
+    history.append([{"problem": "problem_0001", "median": 1.}])
+    history.append([{"problem": "problem_0001", "median": 2.},
+                    {"problem": "problem_0002", "median": 3.}])
+
+    assert len(history.entries()) == 3
+    assert history.baselines() == {
+        "problem_0001": {"problem": "problem_0001", "median": 2.},
+        "problem_0002": {"problem": "problem_0002", "median": 3.},
+    }
+
+
+def test_baselines_skip_regressions(tmpdir):
+    history = bench.History(str(tmpdir))
+    history.append([{"problem": "problem_0001", "median": 1.,
+                     "regression": False}])
+    history.append([{"problem": "problem_0001", "median": 2.,
+                     "regression": True}])
+
+    assert history.baselines()["problem_0001"]["median"] == 1.
+
+
+def test_is_regression():
+    baseline = {"median": 1.}
+
+    assert bench.is_regression({"median": 1.5}, baseline, threshold=.2)
+    assert not bench.is_regression({"median": 1.1}, baseline, threshold=.2)
+    assert not bench.is_regression({"median": 1.5}, None, threshold=.2)
+
+
+def test_summarize_cpu():
+    summary = bench.summarize([1., 2., 3.], [.5, 1., 1.5])
+
+    assert summary["cpu_median"] == 1.
+    assert "cpu_median" not in bench.summarize([1.])
+
+
+class SlowPreparation(EulerProblem):
+    __test__ = False
+    real_input = 10
+
+    def prepare(self):
+        time.sleep(.2)
+        return list(range(100))
+
+    def solver(self, input_val):
+        return sum(self.prepared[:input_val])
+
+
+def test_measure_leaves_out_the_preparation():
+    timings, __ = bench.measure(SlowPreparation, runs=2, warmup=0)
+
+    assert len(timings) == 2
+    assert max(timings) < .1
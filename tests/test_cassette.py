@@ -0,0 +1,70 @@
+import pytest
+
+from pyler import cassette
+from pyler import website as w
+
+from test_website import FakeResponse, FakeSession
+
+
+@pytest.fixture
+def path(tmpdir):
+    return str(tmpdir.join("cassette.jsonl"))
+
+
+def record(path, *answers):
+    session = FakeSession()
+    session.answers.extend(answers)
+    return cassette.RecordingSession(session, path)
+
+
+def test_record_replay(path):
+    recording = record(path, "new_problem.html", FakeResponse(
+        b"missing", url="b", code=404))
+    recorded = recording.get("a", timeout=3)
+    recording.get("b")
+
+    replay = cassette.ReplaySession(path)
+    response = replay.get("a", timeout=3)
+
+    assert response.content == recorded.content
+    assert response.status_code == 200
+    assert response.headers == {"ETag": '"new_problem.html"'}
+    assert replay.get("b").status_code == 404
+
+
+def test_replay_in_order(path):
+    recording = record(path, "answer_incorrect_captcha.html",
+                       "answer_correct.html")
+    first = recording.post("problem=1", data={"captcha": "1"})
+    second = recording.post("problem=1", data={"captcha": "2"})
+
+    replay = cassette.ReplaySession(path)
+
+    assert replay.post("problem=1").content == first.content
+    assert replay.post("problem=1").content == second.content
+    # The last response is served again
+    assert replay.post("problem=1").content == second.content
+
+
+def test_replay_miss(path):
+    record(path, "new_problem.html").get("a")
+
+    replay = cassette.ReplaySession(path)
+
+    with pytest.raises(cassette.CassetteMiss):
+        replay.get("b")
+    with pytest.raises(cassette.CassetteMiss):
+        replay.post("a")
+
+
+def test_website_replay(path, monkeypatch):
+    record(path, "solved_problem.html").get(
+        w.get_url(w.Website, problem_id=1))
+    monkeypatch.setenv(cassette.CASSETTE_ENV, path)
+    monkeypatch.setenv(cassette.MODE_ENV, "replay")
+
+    website = w.Website()
+
+    assert website.http_cache is None
+    assert w.get_problem_content(website, 1).startswith(
+        "If we list all the natural numbers")
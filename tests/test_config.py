@@ -0,0 +1,77 @@
+import json
+import multiprocessing
+
+import pytest
+
+from pyler.config import Config
+
+
+@pytest.fixture
+def config_file(tmpdir, monkeypatch):
+    config_file = tmpdir.join("pyler.conf")
+    config_file.write("")
+    monkeypatch.setenv("PYLER_CONF", str(config_file))
+    return config_file
+
+
+def test_read_write(config_file):
+    config = Config()
+    config["a"] = {"b": 1}
+
+    assert config["a"] == {"b": 1}
+    assert config["c"] is None
+    assert json.loads(config_file.read()) == {"a": {"b": 1}}
+
+
+def test_parsed_once(config_file, mocker):
+    config_file.write(json.dumps({"a": 1}))
+    load = mocker.spy(json, "load")
+
+    assert Config()["a"] == 1
+    assert Config()["a"] == 1
+    assert load.call_count == 1
+
+
+def test_reloaded_when_changed(config_file):
+    config_file.write(json.dumps({"a": 1}))
+    assert Config()["a"] == 1
+
+    config_file.write(json.dumps({"a": 22}))
+
+    assert Config()["a"] == 22
+
+
+def test_cache_not_modified_by_callers(config_file):
+    config = Config()
+    config["answers"] = {"1": 233168}
+
+    config["answers"]["2"] = 4613732
+    config.get_config()["answers"]["3"] = 5
+
+    assert config["answers"] == {"1": 233168}
+
+
+def write_keys(worker):
+    config = Config()
+    for index in range(20):
+        config["{}-{}".format(worker, index)] = index
+
+
+def test_concurrent_writes(config_file):
+    processes = [multiprocessing.Process(target=write_keys, args=(worker,))
+                 for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert len(json.loads(config_file.read())) == 80
+
+
+def test_pending(config_file):
+    config = Config()
+    config.add_pending(3, 6857)
+    config.add_pending(1, 233168)
+    config.remove_pending(3)
+
+    assert config.get_pending() == {1: 233168}
@@ -0,0 +1,42 @@
+import os
+
+from pyler import discovery
+
+
+def test_problem_index(tmpdir):
+    tmpdir.join("problem_0001.py").write("")
+    tmpdir.join("problem_0012.py").write("")
+    tmpdir.join("problem_0012.pyc").write("")
+    tmpdir.join("helpers.py").write("")
+    tmpdir.mkdir("problem_0013.py")
+
+    assert discovery.problem_index(str(tmpdir)) == {
+        1: "problem_0001.py", 12: "problem_0012.py"}
+
+
+def test_problem_index_cached(tmpdir, mocker):
+    tmpdir.join("problem_0001.py").write("")
+    scan = mocker.spy(discovery, "scan")
+
+    discovery.problem_index(str(tmpdir))
+    discovery.problem_index(str(tmpdir))
+    assert scan.call_count == 1
+
+    tmpdir.join("problem_0002.py").write("")
+    # Make sure the folder looks modified, whatever the mtime resolution
+    stat = os.stat(str(tmpdir))
+    os.utime(str(tmpdir), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert discovery.problem_index(str(tmpdir)) == {
+        1: "problem_0001.py", 2: "problem_0002.py"}
+    assert scan.call_count == 2
+
+
+def test_select_files(tmpdir):
+    for problem_id in (1, 2, 3):
+        tmpdir.join(discovery.FILE_NAME_TEMPLATE.format(problem_id)).write("")
+
+    assert discovery.select_files(None, str(tmpdir)) == [
+        "problem_0001.py", "problem_0002.py", "problem_0003.py"]
+    assert discovery.select_files([3, 1, 7], str(tmpdir)) == [
+        "problem_0001.py", "problem_0003.py"]
@@ -0,0 +1,228 @@
+import gc
+import os
+import time
+
+import pytest
+
+from pyler import EulerProblem
+from pyler import execution
+
+
+class Quick(EulerProblem):
+    __test__ = False
+    real_input = 21
+
+    def solver(self, input_val):
+        return input_val * 2
+
+
+class Slow(EulerProblem):
+    __test__ = False
+    real_input = 10
+
+    def solver(self, input_val):
+        time.sleep(input_val)
+
+
+class Broken(EulerProblem):
+    __test__ = False
+
+    def solver(self, input_val):
+        raise ZeroDivisionError("oops")
+
+
+class Crashing(EulerProblem):
+    __test__ = False
+
+    def solver(self, input_val):
+        os._exit(3)
+
+
+def test_run_in_process():
+    real = execution.run_in_process(lambda: 42, time_limit=1)
+
+    assert real.reason == "finished"
+    assert real.returned
+    assert real.result == 42
+
+
+def test_run_in_process_timeout():
+    real = execution.run_in_process(lambda: time.sleep(10), time_limit=.1)
+
+    assert real.reason == "timeout"
+    assert real.timed_out
+    assert not real.returned
+
+
+def test_run_in_process_overtime():
+    real = execution.run_in_process(
+        lambda: time.sleep(.2) or 42, time_limit=.1, use_signal=False)
+
+    assert real.reason == "overtime"
+    assert real.returned
+    assert real.timed_out
+    assert real.result == 42
+
+
+def test_run_isolated():
+    real = execution.run_isolated(Quick, "solve_real", time_limit=5)
+
+    assert real.reason == "finished"
+    assert real.result == 42
+    assert real.elapsed < 5
+
+
+def test_run_isolated_timeout():
+    before = time.time()
+    real = execution.run_isolated(Slow, "solve_real", time_limit=.2)
+
+    assert real.reason == "timeout"
+    assert time.time() - before < 5
+
+
+def test_run_isolated_error():
+    real = execution.run_isolated(Broken, "solve_real", time_limit=5)
+
+    assert real.reason == "error"
+    assert "ZeroDivisionError: oops" in real.details
+
+
+def test_run_isolated_crashed():
+    real = execution.run_isolated(Crashing, "solve_real", time_limit=5)
+
+    assert real.reason == "crashed"
+    assert "code 3" in real.details
+
+
+class Greedy(EulerProblem):
+    __test__ = False
+    real_input = 4 * 1024 ** 3
+
+    def solver(self, input_val):
+        return len(bytearray(input_val))
+
+
+@pytest.mark.skipif(execution.resource is None,
+                    reason="Needs the resource module")
+def test_run_isolated_out_of_memory():
+    real = execution.run_isolated(Greedy, "solve_real", time_limit=5,
+                                  memory_limit=2 * 1024 ** 3)
+
+    assert real.reason == "out_of_memory"
+    assert "MemoryError" in real.details
+
+
+@pytest.mark.skipif(execution.resource is None,
+                    reason="Needs the resource module")
+def test_run_isolated_measures_memory():
+    real = execution.run_isolated(Quick, "solve_real", time_limit=5,
+                                  trace_memory=True)
+
+    assert real.reason == "finished"
+    assert real.peak_rss > 0
+    assert real.peak_traced > 0
+
+
+class Frugal(Greedy):
+    __test__ = False
+    real_input = 200 * 1024 ** 2
+
+
+@pytest.mark.skipif(execution.resource is None,
+                    reason="Needs the resource module")
+def test_run_isolated_ignores_the_memory_of_the_parent():
+    ballast = b"x" * (512 * 1024 ** 2)
+    real = execution.run_isolated(Quick, "solve_real", time_limit=5)
+    frugal = execution.run_isolated(Frugal, "solve_real", time_limit=5,
+                                    memory_limit=600 * 1024 ** 2)
+    del ballast
+
+    assert real.reason == "finished"
+    assert real.peak_rss < 128 * 1024 ** 2
+    assert frugal.reason == "finished"
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_run_in_process_measures_both_clocks():
+    real = execution.run_in_process(
+        lambda: time.sleep(.1) or busy(.05), time_limit=1)
+
+    assert real.elapsed >= .15
+    assert .04 <= real.cpu_time < real.elapsed
+    assert real.time("cpu") == real.cpu_time
+    assert real.time("wall") == real.elapsed
+
+
+def test_run_in_process_cpu_clock():
+    # Sleeping does not count on the CPU clock
+    real = execution.run_in_process(
+        lambda: time.sleep(.2) or 42, time_limit=.1, clock="cpu")
+    assert real.reason == "finished"
+
+    real = execution.run_in_process(lambda: busy(10), time_limit=.1,
+                                    clock="cpu")
+    assert real.reason == "timeout"
+
+
+class SlowSleeper(EulerProblem):
+    __test__ = False
+    real_input = .3
+
+    def solver(self, input_val):
+        time.sleep(input_val)
+        return 42
+
+
+def test_run_isolated_cpu_clock():
+    real = execution.run_isolated(SlowSleeper, "solve_real", time_limit=.2,
+                                  clock="cpu")
+
+    assert real.reason == "finished"
+    assert real.result == 42
+    assert real.cpu_time < .2 < real.elapsed
+
+
+def test_timer_disables_gc():
+    with execution.Timer(disable_gc=True) as timer:
+        assert not gc.isenabled()
+    assert gc.isenabled()
+    assert timer.elapsed >= 0
+    assert timer.cpu_time >= 0
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"),
+                    reason="Needs sched_setaffinity")
+def test_pin_cpus():
+    cpus = os.sched_getaffinity(0)
+    try:
+        assert execution.pin_cpus({min(cpus)})
+        assert os.sched_getaffinity(0) == {min(cpus)}
+    finally:
+        os.sched_setaffinity(0, cpus)
+
+    assert not execution.pin_cpus(None)
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"),
+                    reason="Needs sched_setaffinity")
+def test_pinned_cpus():
+    cpus = os.sched_getaffinity(0)
+    with execution.pinned_cpus({min(cpus)}):
+        assert os.sched_getaffinity(0) == {min(cpus)}
+    assert os.sched_getaffinity(0) == cpus
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"),
+                    reason="Needs sched_setaffinity")
+def test_run_isolated_pins_the_child_only():
+    cpus = os.sched_getaffinity(0)
+    real = execution.run_isolated(Quick, "solve_real", time_limit=5,
+                                  cpus={min(cpus)})
+
+    assert real.reason == "finished"
+    assert os.sched_getaffinity(0) == cpus
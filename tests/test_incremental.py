@@ -0,0 +1,38 @@
+from pyler import incremental as inc
+
+
+def test_imported_modules():
+    source = "import os.path\nfrom helpers import primes\nfrom . import x\n"
+
+    assert inc.imported_modules(source) == {"os", "helpers"}
+
+
+def test_fingerprint_follows_local_imports(tmpdir):
+    tmpdir.join("problem_0001.py").write("import helpers\n")
+    tmpdir.join("helpers.py").write("from tools import sieve\n")
+    tmpdir.join("tools.py").write("sieve = 1\n")
+    tmpdir.join("unrelated.py").write("")
+
+    before = inc.fingerprint(str(tmpdir), "problem_0001.py")
+    tmpdir.join("unrelated.py").write("a = 1\n")
+    assert inc.fingerprint(str(tmpdir), "problem_0001.py") == before
+
+    tmpdir.join("tools.py").write("sieve = 2\n")
+    assert inc.fingerprint(str(tmpdir), "problem_0001.py") != before
+
+
+def test_results(tmpdir):
+    results = inc.Results(str(tmpdir))
+    results.update({"problem_0001": "abc"}, [
+        {"problem": "problem_0001", "id": "problem_0001.Problem0001.test_real",
+         "outcome": "success"},
+        {"problem": "problem_0001", "id": "problem_0001.Problem0001.test_time",
+         "outcome": "failure"},
+    ])
+    results.save()
+
+    results = inc.Results(str(tmpdir))
+    assert results.is_fresh("problem_0001", "abc", ["test_real"])
+    assert not results.is_fresh("problem_0001", "abc", ["test_time"])
+    assert not results.is_fresh("problem_0001", "def", ["test_real"])
+    assert not results.is_fresh("problem_0002", "abc", ["test_real"])
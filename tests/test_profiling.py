@@ -0,0 +1,51 @@
+import io
+
+from pyler import EulerProblem
+from pyler import profiling
+
+
+class Problem(EulerProblem):
+    __test__ = False
+    simple_input = 10
+    real_input = 1000
+
+    def solver(self, input_val):
+        return sorted(str(element) for element in range(input_val))
+
+
+def test_profile(tmpdir):
+    profiler, snapshot, peak = profiling.profile(Problem, memory=True)
+
+    stream = io.StringIO()
+    profiling.write_report(stream, profiler, snapshot, top=5, peak=peak)
+    report = stream.getvalue()
+    assert "(solver)" in report
+    assert "Peak of traced memory" in report
+    assert "allocation sites" in report
+
+    file_names = profiling.save(str(tmpdir), "problem_0001", profiler,
+                                snapshot)
+    assert [name.split(".")[-1] for name in file_names] == [
+        "pstats", "snapshot"]
+    assert all(tmpdir.join(".pyler", "profiles").listdir())
+
+
+def test_profile_no_memory():
+    __, snapshot, peak = profiling.profile(Problem, "solve_simple")
+
+    assert snapshot is None
+    assert peak is None
+
+
+class Sieve(Problem):
+    __test__ = False
+
+    def solver(self, input_val):
+        return len(bytearray(input_val * 1000))
+
+
+def test_profile_peak_includes_freed_memory():
+    __, snapshot, peak = profiling.profile(Sieve, memory=True)
+
+    assert peak >= 1000 * 1000
+    assert sum(stat.size for stat in snapshot.statistics("lineno")) < peak
@@ -0,0 +1,75 @@
+import json
+import xml.etree.ElementTree as ElementTree
+
+from pyler import reports
+
+
+def record(test_id, outcome, duration=1., details="", **measurements):
+    return {
+        "id": test_id,
+        "problem": test_id.split(".")[0],
+        "outcome": outcome,
+        "details": details,
+        "duration": duration,
+        "measurements": measurements,
+    }
+
+
+RECORDS = [
+    record("problem_0001.Problem0001.test_simple", "success"),
+    record("problem_0001.Problem0001.test_real", "success", elapsed=.5,
+           answer_source="cache"),
+    record("problem_0002.Problem0002.test_real", "failure", details="Boom",
+           elapsed=2., answer_source="network"),
+    record("problem_0002.Problem0002.test_simple", "success"),
+    record("problem_0003.Problem0003.test_real", "pending", duration=None,
+           answer_source="pending"),
+]
+
+
+def test_json(tmpdir):
+    output = str(tmpdir.join("report.json"))
+    reports.write(RECORDS, "json", output)
+
+    with open(output) as handler:
+        report = json.load(handler)
+
+    assert report["successful"] is False
+    first, second, third = report["problems"]
+    assert first["problem"] == "problem_0001"
+    assert first["outcome"] == "success"
+    assert first["duration"] == 2.
+    assert first["solve_time"] == .5
+    assert first["answer_source"] == "cache"
+    assert [test["name"] for test in first["tests"]] == [
+        "test_real", "test_simple"]
+    assert second["outcome"] == "failure"
+    assert second["answer_source"] == "network"
+    assert third["outcome"] == "pending"
+
+
+def test_problem_outcome_ignores_skipped_tests():
+    records = [
+        record("problem_0001.Problem0001.test_real", "success"),
+        record("problem_0001.Problem0001.test_memory", "skipped"),
+    ]
+
+    assert reports.problem_outcome(records) == "success"
+    assert reports.problem_outcome(records[1:]) == "skipped"
+
+
+def test_junit():
+    root = ElementTree.fromstring(reports.to_junit(RECORDS))
+
+    suites = root.findall("testsuite")
+    assert [suite.get("name") for suite in suites] == [
+        "problem_0001", "problem_0002", "problem_0003"]
+    assert suites[1].get("failures") == "1"
+    assert suites[2].get("skipped") == "1"
+
+    properties = {prop.get("name"): prop.get("value")
+                  for prop in suites[1].find("properties")}
+    assert properties == {"solve_time": "2.0", "answer_source": "network"}
+
+    failure = suites[1].find("testcase[@name='test_real']/failure")
+    assert failure.text == "Boom"
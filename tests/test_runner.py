@@ -0,0 +1,132 @@
+import io
+
+import pytest
+
+from pyler import runner
+
+PROBLEM = """from pyler import EulerProblem
+
+
+class Problem{problem_id:04d}(EulerProblem):
+    problem_id = {problem_id}
+    simple_input = 10
+    simple_output = 23
+    real_input = 1000
+
+    def solver(self, input_val):
+        return {answer}
+"""
+
+
+@pytest.fixture
+def problems(tmpdir, monkeypatch):
+    tmpdir.join("problem_0001.py").write(
+        PROBLEM.format(problem_id=1, answer=23))
+    tmpdir.join("problem_0002.py").write(
+        PROBLEM.format(problem_id=2, answer=24))
+    monkeypatch.syspath_prepend(str(tmpdir))
+    return tmpdir
+
+
+def test_run_problem(problems):
+    records = runner.run_problem(["problem_0001.Problem0001.test_simple"])
+
+    assert len(records) == 1
+    assert records[0]["id"] == "problem_0001.Problem0001.test_simple"
+    assert records[0]["problem"] == "problem_0001"
+    assert records[0]["outcome"] == "success"
+    assert records[0]["duration"] >= 0
+
+
+def test_run_problem_failure(problems):
+    records = runner.run_problem(["problem_0002.Problem0002.test_simple"])
+
+    assert records[0]["outcome"] == "failure"
+    assert "24 != 23" in records[0]["details"]
+
+
+def test_run_groups(problems):
+    stream = io.StringIO()
+    records = runner.run_groups(
+        [["problem_0001.Problem0001.test_simple"],
+         ["problem_0002.Problem0002.test_simple"]],
+        path=str(problems), jobs=2, stream=stream)
+
+    assert sorted(record["outcome"] for record in records) == [
+        "failure", "success"]
+    assert not runner.was_successful(records)
+
+    report = stream.getvalue()
+    assert "FAIL: problem_0002.Problem0002.test_simple" in report
+    assert "Ran 2 tests" in report
+    assert "FAILED (failures=1)" in report
+
+
+def test_problem_durations():
+    records = [
+        {"problem": "problem_0001", "duration": 1.},
+        {"problem": "problem_0001", "duration": 2.},
+        {"problem": "problem_0002", "duration": None},
+    ]
+
+    assert runner.problem_durations(records) == {
+        "problem_0001": 3., "problem_0002": 0.}
+
+
+def test_problem_measurements():
+    records = [
+        {"problem": "problem_0001", "measurements": {"elapsed": 1.}},
+        {"problem": "problem_0001", "measurements": {"peak_rss": 2048}},
+        {"problem": "problem_0002", "measurements": {}},
+    ]
+
+    assert runner.problem_measurements(records) == {
+        "problem_0001": {"elapsed": 1., "peak_rss": 2048},
+        "problem_0002": {}}
+
+
+def test_run_problem_load_failure(tmpdir, monkeypatch):
+    tmpdir.join("problem_0003.py").write("syntax error(")
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    records = runner.run_problem(["problem_0003.Problem0003.test_simple"])
+
+    assert len(records) == 1
+    assert records[0]["id"] == "problem_0003.load"
+    assert records[0]["outcome"] == "error"
+    assert "SyntaxError" in records[0]["details"]
+
+
+def test_run_problem_not_implemented(tmpdir, monkeypatch):
+    tmpdir.join("problem_0004.py").write(
+        "from pyler import EulerProblem\n\n\n"
+        "class Problem0004(EulerProblem):\n"
+        "    problem_id = 4\n")
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    records = runner.run_problem(["problem_0004.Problem0004.test_real",
+                                  "problem_0004.Problem0004.test_simple"])
+
+    assert [record["id"] for record in records] == [
+        "problem_0004.Problem0004.test_real",
+        "problem_0004.Problem0004.test_simple"]
+    assert all(record["outcome"] == "skipped" for record in records)
+
+
+def test_run_groups_worker_crash(problems):
+    problems.join("problem_0005.py").write(
+        PROBLEM.format(problem_id=5, answer="__import__('os')._exit(9)"))
+    stream = io.StringIO()
+    records = runner.run_groups(
+        [["problem_0005.Problem0005.test_simple"],
+         ["problem_0001.Problem0001.test_simple"],
+         ["problem_0002.Problem0002.test_simple"]],
+        path=str(problems), jobs=2, stream=stream)
+
+    outcomes = {record["id"]: record["outcome"] for record in records}
+    assert outcomes == {
+        "problem_0005.Problem0005.test_simple": "error",
+        "problem_0001.Problem0001.test_simple": "success",
+        "problem_0002.Problem0002.test_simple": "failure",
+    }
+    assert "BrokenProcessPool" in stream.getvalue()
@@ -0,0 +1,51 @@
+import pytest
+
+from pyler import EulerProblem
+from pyler import scaling
+
+
+class QuadraticProblem(EulerProblem):
+    __test__ = False
+    scaling_inputs = [10, 20, 40]
+    calls = []
+
+    def solver(self, input_val):
+        type(self).calls.append(input_val)
+        return input_val ** 2
+
+
+def test_fit():
+    fit = scaling.Fit([(10, .01), (100, 1.), (1000, 100.)])
+
+    assert fit.exponent == pytest.approx(2.)
+    assert fit.r_squared == pytest.approx(1.)
+    assert fit.project(10000) == pytest.approx(10000.)
+
+
+def test_fit_needs_sizes():
+    with pytest.raises(ValueError):
+        scaling.Fit([(10, .01), (10, .02)])
+
+
+def test_measure():
+    points = scaling.measure(QuadraticProblem)
+
+    assert [size for size, __ in points] == [10, 20, 40]
+    assert all(duration > 0 for __, duration in points)
+    assert set(QuadraticProblem.calls) == {10, 20, 40}
+
+
+def test_input_size():
+    problem = QuadraticProblem("solve_real")
+
+    assert problem.input_size(-12) == 12
+    assert problem.input_size([1, 2, 3]) == 3
+
+
+def test_format_estimate():
+    fit = scaling.Fit([(10, .01), (100, 1.)])
+
+    assert scaling.format_estimate(fit, 1000, time_limit=60) == (
+        "Estimated complexity: O(n^2.00) (r^2 = 1.000)\n"
+        "Projected time for the real input (size 1000): 100s "
+        "OVER THE 60s LIMIT")
@@ -0,0 +1,69 @@
+from pyler import scheduling
+
+
+def group(problem, *tests):
+    return ["{}.Problem{}.test_{}".format(problem, problem[-4:], test)
+            for test in tests]
+
+
+def test_schedule_longest_first(tmpdir):
+    durations = scheduling.Durations(str(tmpdir))
+    durations.durations = {
+        "problem_0001": {"solve": 1., "simple": .1},
+        "problem_0002": {"solve": 30., "simple": .1},
+        "problem_0003": {"solve": 5., "simple": 20.},
+    }
+    groups = [group("problem_0001", "real", "simple"),
+              group("problem_0002", "real", "simple"),
+              group("problem_0003", "real", "simple")]
+
+    assert [g[0][:12] for g in durations.schedule(groups)] == [
+        "problem_0002", "problem_0003", "problem_0001"]
+
+    # Only the simple tests
+    groups = [group("problem_0002", "simple"), group("problem_0003", "simple")]
+    assert [g[0][:12] for g in durations.schedule(groups)] == [
+        "problem_0003", "problem_0002"]
+
+
+def test_schedule_without_history(tmpdir):
+    durations = scheduling.Durations(str(tmpdir))
+    durations.durations = {
+        "problem_0001": {"solve": 1.},
+        "problem_0002": {"solve": 2.},
+        "problem_0003": {"solve": 30.},
+    }
+    groups = [group("problem_{:04d}".format(problem_id), "real")
+              for problem_id in range(1, 6)]
+
+    # Unknown problems are estimated at the median (2s), higher ids first
+    assert [g[0][:12] for g in durations.schedule(groups)] == [
+        "problem_0003", "problem_0005", "problem_0004", "problem_0002",
+        "problem_0001"]
+
+
+def test_update(tmpdir):
+    durations = scheduling.Durations(str(tmpdir))
+    records = [
+        {"id": "problem_0001.Problem0001.test_simple", "outcome": "success",
+         "problem": "problem_0001", "duration": .5, "measurements": {}},
+        {"id": "problem_0001.Problem0001.test_real", "outcome": "success",
+         "problem": "problem_0001", "duration": 3.,
+         "measurements": {"elapsed": 2., "prepare_time": 1.}},
+        {"id": "problem_0001.Problem0001.test_time", "outcome": "success",
+         "problem": "problem_0001", "duration": 0.,
+         "measurements": {"elapsed": 2., "prepare_time": 1.}},
+        {"id": "problem_0002.Problem0002.test_real", "outcome": "skipped",
+         "problem": "problem_0002", "duration": 0., "measurements": {}},
+    ]
+    durations.update(records)
+    durations.save()
+
+    durations = scheduling.Durations(str(tmpdir))
+    assert durations.durations == {
+        "problem_0001": {"solve": 3., "simple": .5}}
+
+    records[1]["measurements"] = {"elapsed": 5.}
+    records[2]["measurements"] = {"elapsed": 5.}
+    durations.update(records)
+    assert durations.durations["problem_0001"]["solve"] == 4.
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+# Generous, so that it only catches real regressions (such as importing
+# the network stack again) and not a slow CI machine
+MAX_STARTUP_TIME = 1.
+
+STARTUP = """
+import sys
+import time
+
+before = time.perf_counter()
+import pyler.__main__
+from pyler import runner
+print(time.perf_counter() - before)
+print(",".join(sorted(
+    name for name in ("bs4", "requests", "multiprocessing")
+    if name in sys.modules)))
+"""
+
+
+def measure_startup():
+    output = subprocess.check_output(
+        [sys.executable, "-c", STARTUP], universal_newlines=True)
+    elapsed, loaded = output.splitlines()
+    return float(elapsed), loaded
+
+
+def test_startup_does_not_load_network_stack():
+    __, loaded = measure_startup()
+
+    assert loaded == ""
+
+
+def test_startup_time():
+    # Best of a few runs, to smooth the noise
+    elapsed = min(measure_startup()[0] for __ in range(3))
+
+    assert elapsed < MAX_STARTUP_TIME
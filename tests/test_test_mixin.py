@@ -1,6 +1,12 @@
+import time
+import unittest
 from unittest import mock
 
-from pyler import EulerProblem
+import pytest
+
+from pyler import EulerProblem, runner
+from pyler.euler_test_base import NOT_PREPARED
+from pyler.config import Config
 
 
 class Problem1(EulerProblem):
@@ -55,3 +61,134 @@ class BadProblem1(EulerProblem):
     simple_input = 10
     simple_output = 23
     real_input = 1000
+
+
+class IsolatedProblem1(Problem1):
+    isolated = True
+
+
+class CountingProblem1(Problem1):
+    __test__ = False
+    calls = 0
+
+    def solve_real(self):
+        type(self).calls += 1
+        return super().solve_real()
+
+
+def test_solve_real_runs_once():
+    suite = unittest.defaultTestLoader.loadTestsFromTestCase(CountingProblem1)
+    result = unittest.TestResult()
+    suite.run(result)
+
+    assert result.wasSuccessful()
+    assert result.testsRun == 4
+    assert CountingProblem1.calls == 1
+
+
+def test_memory_without_limit_passes():
+    result = unittest.TestResult()
+    CountingProblem1("test_memory").run(result)
+
+    assert result.wasSuccessful()
+    assert result.skipped == []
+
+
+class RaisingProblem1(CountingProblem1):
+    __test__ = False
+    calls = 0
+
+    def solver(self, input_val):
+        if input_val == self.real_input:
+            raise ZeroDivisionError()
+        return super().solver(input_val)
+
+
+def test_solve_real_raising_runs_once():
+    suite = unittest.defaultTestLoader.loadTestsFromTestCase(RaisingProblem1)
+    result = unittest.TestResult()
+    suite.run(result)
+
+    assert len(result.failures) == 2
+    assert "ZeroDivisionError" in result.failures[0][1]
+    assert RaisingProblem1.calls == 1
+
+
+class PreparedProblem1(EulerProblem):
+    __test__ = False
+    problem_id = 1
+    simple_input = 10
+    simple_output = 23
+    real_input = 1000
+    preparations = 0
+
+    def prepare(self):
+        type(self).preparations += 1
+        return [element for element in range(1000)
+                if any(element % x == 0 for x in [3, 5])]
+
+    def solver(self, input_val):
+        return sum(element for element in self.prepared
+                   if element < input_val)
+
+    def test_real(self):
+        with mock.patch("pyler.website.check_solution", return_value=True):
+            super().test_real()
+
+
+def test_prepare_runs_once():
+    suite = unittest.defaultTestLoader.loadTestsFromTestCase(PreparedProblem1)
+    result = unittest.TestResult()
+    suite.run(result)
+
+    assert result.wasSuccessful()
+    assert PreparedProblem1.preparations == 1
+
+
+def test_prepared_released_after_the_tests():
+    suite = unittest.defaultTestLoader.loadTestsFromTestCase(PreparedProblem1)
+    suite.run(unittest.TestResult())
+
+    assert PreparedProblem1._prepared is NOT_PREPARED
+    assert PreparedProblem1._prepare_time is None
+
+
+class HangingPreparationProblem1(PreparedProblem1):
+    __test__ = False
+    time_limit = .2
+
+    def prepare(self):
+        time.sleep(5)
+
+
+@pytest.mark.skipif(not EulerProblem.use_signal, reason="Needs SIGALRM")
+def test_hanging_prepare_interrupted():
+    before = time.perf_counter()
+    real = HangingPreparationProblem1("test_time").execute_real()
+
+    assert real.reason == "timeout"
+    assert time.perf_counter() - before < 2
+
+
+class DeferredProblem1(Problem1):
+    __test__ = False
+    defer_submission = True
+
+
+def test_deferred_submission(tmpdir, monkeypatch):
+    config_file = tmpdir.join("pyler.conf")
+    config_file.write("")
+    monkeypatch.setenv("PYLER_CONF", str(config_file))
+
+    result = runner.RecordingResult("problem_0001")
+    DeferredProblem1("test_real").run(result)
+
+    assert result.records[0]["outcome"] == "pending"
+    assert Config().get_pending() == {1: 233168}
+
+    Config().set_answer(1, 233168)
+    result = runner.RecordingResult("problem_0001")
+    DeferredProblem1("test_real").run(result)
+
+    assert result.records[0]["outcome"] == "success"
+    assert Config().get_pending() == {}
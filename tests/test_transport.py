@@ -0,0 +1,138 @@
+import http.server
+import threading
+import time
+
+import pytest
+import requests
+
+from pyler.transport import TokenBucket, Transport
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answers with the next status of the server's script (200 once the
+    script is over), and counts the requests per method.
+    """
+
+    def respond(self):
+        self.server.counts[self.command] += 1
+        status, headers = (self.server.script.pop(0) if self.server.script
+                           else (200, {}))
+        if status == "hang":
+            time.sleep(.5)
+            status = 200
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    do_GET = do_POST = respond
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture
+def server():
+    server = http.server.HTTPServer(("127.0.0.1", 0), StubHandler)
+    server.script = []
+    server.counts = {"GET": 0, "POST": 0}
+    server.url = "http://127.0.0.1:{}/".format(server.server_port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def transport():
+    return Transport(rate=0, retries=3, backoff=.01)
+
+
+def test_retries_transient_errors(server, transport):
+    server.script = [(503, {}), (502, {})]
+
+    response = transport.request(requests.Session(), "get", server.url)
+
+    assert response.status_code == 200
+    assert server.counts["GET"] == 3
+    assert transport.stats["retries"] == 2
+    assert transport.stats["requests"] == 3
+    assert transport.stats["waited"] == pytest.approx(.03)
+
+
+def test_gives_up_after_retries(server, transport):
+    server.script = [(500, {})] * 5
+
+    response = transport.request(requests.Session(), "get", server.url)
+
+    assert response.status_code == 500
+    assert server.counts["GET"] == 4
+
+
+def test_no_retry_on_client_error(server, transport):
+    server.script = [(404, {})]
+
+    response = transport.request(requests.Session(), "get", server.url)
+
+    assert response.status_code == 404
+    assert server.counts["GET"] == 1
+
+
+def test_post_not_retried_once_processed(server, transport):
+    server.script = [(500, {})]
+
+    response = transport.request(requests.Session(), "post", server.url)
+
+    assert response.status_code == 500
+    assert server.counts["POST"] == 1
+
+
+def test_post_retried_when_refused(server, transport):
+    server.script = [(429, {"Retry-After": "0.02"})]
+
+    response = transport.request(requests.Session(), "post", server.url)
+
+    assert response.status_code == 200
+    assert server.counts["POST"] == 2
+    assert transport.stats["waited"] == pytest.approx(.02)
+
+
+def test_timeout(server, transport):
+    transport.timeout = .1
+    transport.retries = 1
+    server.script = [("hang", {}), ("hang", {})]
+
+    with pytest.raises(requests.Timeout):
+        transport.request(requests.Session(), "get", server.url)
+    assert transport.stats["retries"] == 1
+
+
+def test_backoff_delay(transport):
+    transport.backoff = 1
+    transport.max_backoff = 5
+
+    assert [transport.backoff_delay(attempt) for attempt in range(4)] == [
+        1, 2, 4, 5]
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=20, burst=2)
+
+    before = time.monotonic()
+    waited = sum(bucket.acquire() for __ in range(4))
+
+    # The burst goes through, the 2 others wait for their token
+    assert time.monotonic() - before >= .09
+    assert waited == pytest.approx(.1, abs=.01)
+
+
+def test_token_bucket_no_limit():
+    bucket = TokenBucket(rate=0)
+
+    assert sum(bucket.acquire() for __ in range(100)) == 0
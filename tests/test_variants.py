@@ -0,0 +1,80 @@
+import pytest
+
+from pyler import EulerProblem
+from pyler import variants
+
+
+class VariantsProblem(EulerProblem):
+    __test__ = False
+    simple_input = 10
+    simple_output = 23
+    real_input = 1000
+
+    def solver_loop(self, input_val):
+        return sum(element for element in range(input_val)
+                   if element % 3 == 0 or element % 5 == 0)
+
+    def solver_formula(self, input_val):
+        def total(step):
+            count = (input_val - 1) // step
+            return step * count * (count + 1) // 2
+        return total(3) + total(5) - total(15)
+
+    solver = solver_formula
+
+
+class WrongVariantProblem(VariantsProblem):
+    __test__ = False
+
+    def solver_wrong(self, input_val):
+        return 23 if input_val == 10 else 0
+
+
+def test_candidate_solvers():
+    assert VariantsProblem.candidate_solvers() == [
+        "solver_formula", "solver_loop"]
+    assert EulerProblem.candidate_solvers() == []
+
+
+def test_check():
+    answers, errors = variants.check(VariantsProblem)
+
+    assert errors == []
+    assert answers == {"solver_formula": 233168, "solver_loop": 233168}
+
+
+def test_check_disagreement():
+    __, errors = variants.check(WrongVariantProblem)
+
+    assert errors == [
+        "The real answers differ: solver_formula=233168, solver_loop=233168, "
+        "solver_wrong=0"]
+
+
+def test_measure():
+    timings, cpu_timings = variants.measure(VariantsProblem, runs=3,
+                                            disable_gc=True)
+
+    assert sorted(timings) == ["solver_formula", "solver_loop"]
+    assert all(len(durations) == 3 for durations in timings.values())
+    assert sorted(cpu_timings) == sorted(timings)
+
+
+def test_confidence_interval():
+    mean, half_width = variants.confidence_interval([1., 2., 3.])
+
+    assert mean == 2.
+    # t(2 degrees of freedom) * stdev / sqrt(3)
+    assert half_width == pytest.approx(4.303 / 3 ** .5)
+
+
+def test_rank():
+    entries = variants.rank({
+        "slow": [2., 2.1, 1.9],
+        "fast": [1., 1.1, .9],
+        "close": [1.05, 1.15, .95],
+    })
+
+    assert [entry["solver"] for entry in entries] == ["fast", "close", "slow"]
+    assert [entry["tied"] for entry in entries] == [False, True, False]
+    assert entries[2]["ratio"] == pytest.approx(2.)
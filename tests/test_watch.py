@@ -0,0 +1,39 @@
+import io
+import sys
+
+from pyler import watch
+
+from test_runner import PROBLEM
+
+
+def test_changed_files(tmpdir):
+    tmpdir.join("problem_0001.py").write("")
+    tmpdir.join("problem_0002.py").write("")
+    tmpdir.join("helpers.py").write("")
+    before = watch.snapshot(str(tmpdir))
+
+    assert sorted(before) == ["problem_0001.py", "problem_0002.py"]
+    assert watch.snapshot(str(tmpdir), problem_ids=[2]) == {
+        "problem_0002.py": before["problem_0002.py"]}
+
+    after = dict(before, **{"problem_0002.py": 1, "problem_0003.py": 2})
+    assert watch.changed_files(before, after) == [
+        "problem_0002.py", "problem_0003.py"]
+
+
+def test_rerun_reloads(tmpdir, monkeypatch):
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    monkeypatch.syspath_prepend(str(tmpdir))
+    problem = tmpdir.join("problem_0005.py")
+    stream = io.StringIO()
+
+    problem.write(PROBLEM.format(problem_id=5, answer=23))
+    records = watch.rerun(str(tmpdir), "problem_0005.py", ["simple"],
+                          stream=stream)
+    assert records[0]["outcome"] == "success"
+
+    problem.write(PROBLEM.format(problem_id=5, answer=24))
+    records = watch.rerun(str(tmpdir), "problem_0005.py", ["simple"],
+                          stream=stream)
+    assert records[0]["outcome"] == "failure"
+    assert "Ran 1 test in" in stream.getvalue()
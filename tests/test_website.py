@@ -1,18 +1,23 @@
+import concurrent.futures
+import itertools
 import os
 import pathlib
 import tempfile
+import time
 
 import pytest
 
 from pyler import website as w
+from pyler.cache import HttpCache
 from pyler.config import Config
 
 
 class FakeResponse(object):
-    def __init__(self, content, url, code=200):
+    def __init__(self, content, url, code=200, headers=None):
         self.content = content
         self.url = url
-        self.code = code
+        self.code = self.status_code = code
+        self.headers = headers or {}
 
 
 SAVED = pathlib.Path(__file__).parent / "saved_html"
@@ -25,30 +30,37 @@ class FakeSession(object):
         self.posted_data = []
         self.answers = []
         self.history = []
+        self.headers = []
 
-    def get(self, url):
+    def get(self, url, headers=None, timeout=None):
         self.history.append(url)
+        self.headers.append(headers)
         try:
-            path = os.path.join(str(SAVED), self.answers.pop(0))
+            answer = self.answers.pop(0)
         except IndexError:
             raise IndexError("Not enough pages prepared (history: {})".format(
                 ", ".join(self.history)))
-        with open(path, "rb") as f:
+        if isinstance(answer, FakeResponse):
+            return answer
+        with open(os.path.join(str(SAVED), answer), "rb") as f:
             return FakeResponse(
                 content=f.read(),
-                url=url)
+                url=url,
+                headers={"ETag": '"{}"'.format(answer)})
 
-    def post(self, url, data):
+    def post(self, url, data, timeout=None):
         self.posted_data.append(data)
         return self.get(url)
 
 
 class FakeWebsite(w.Website):
     base_url = ""
+    request_interval = 0
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._session = FakeSession()
+        self.http_cache = None
 
     def add_answers(self, *answers):
         self.session.answers.extend(answers)
@@ -100,6 +112,111 @@ def test_get_problem_content(website):
     assert content.startswith("If we list all the natural numbers")
 
 
+def test_get_problem_content_cached(website, tmpdir):
+    website.http_cache = HttpCache(str(tmpdir))
+    website.add_answers("solved_problem.html")
+
+    first = w.get_problem_content(website, problem_id=1)
+    second = w.get_problem_content(website, problem_id=1)
+
+    assert first == second
+    assert website.session.history == ["problem=1"]
+
+
+def test_get_problem_content_revalidated(website, tmpdir):
+    website.http_cache = HttpCache(str(tmpdir), ttl=0)
+    website.add_answers("solved_problem.html",
+                        FakeResponse(content=b"", url="problem=1", code=304))
+
+    first = w.get_problem_content(website, problem_id=1)
+    second = w.get_problem_content(website, problem_id=1)
+
+    assert first == second
+    assert website.session.history == ["problem=1", "problem=1"]
+    assert website.session.headers == [
+        None, {"If-None-Match": '"solved_problem.html"'}]
+
+
+def test_get_problem_content_not_accessible_not_cached(website, tmpdir):
+    website.http_cache = HttpCache(str(tmpdir))
+    website.add_answers(FakeResponse(
+        content=b'<div id="message">Problem not accessible</div>',
+        url="problem=900"))
+
+    with pytest.raises(ValueError):
+        w.get_problem_content(website, problem_id=900)
+
+    # Once published, the problem is fetched again
+    website.add_answers("solved_problem.html")
+    content = w.get_problem_content(website, problem_id=900)
+
+    assert content.startswith("If we list all the natural numbers")
+    assert website.session.history == ["problem=900", "problem=900"]
+
+
+def test_get_problem_content_offline(website, tmpdir):
+    website.http_cache = HttpCache(str(tmpdir))
+    website.offline = True
+
+    with pytest.raises(ValueError):
+        w.get_problem_content(website, problem_id=1)
+
+    assert website.session.history == []
+
+
+def test_iter_problem_contents(website, mocker):
+    def get_problem_content(website, problem_id):
+        if problem_id > 5:
+            raise w.Website.NotAccessible("Cannot access the problem")
+        # The first problems are the slowest to come
+        time.sleep((10 - problem_id) / 1000)
+        return "content {}".format(problem_id)
+
+    mocker.patch("pyler.website.get_problem_content",
+                 side_effect=get_problem_content)
+
+    contents = w.iter_problem_contents(
+        website, itertools.count(1), jobs=4)
+
+    assert list(contents) == [
+        (problem_id, "content {}".format(problem_id))
+        for problem_id in range(1, 6)]
+
+
+def test_session_shared_between_threads(mocker):
+    def make_session():
+        time.sleep(.01)
+        return FakeSession()
+
+    website = w.Website()
+    mocker.patch.object(website, "make_session", side_effect=make_session)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        sessions = list(executor.map(
+            lambda __: website.session, range(4)))
+
+    assert website.make_session.call_count == 1
+    assert all(session is sessions[0] for session in sessions)
+
+
+def test_iter_problem_contents_not_cached(website, tmpdir):
+    website.http_cache = HttpCache(str(tmpdir))
+    website.offline = True
+
+    with pytest.raises(w.Website.NotCached):
+        list(w.iter_problem_contents(website, [1, 2]))
+
+
+def test_requests_go_through_transport(website, mocker):
+    request = mocker.spy(website.transport, "request")
+    website.add_answers("new_problem.html")
+
+    w.request_get(website, problem_id=1)
+
+    request.assert_called_once_with(website.session, "get", "problem=1")
+    assert website.session.history == ["problem=1"]
+
+
 def test_connect(config, website, input, default_open):
     """
     We try to connect to the project euler website, and answer the catcha
@@ -227,6 +344,35 @@ def test_get_soup(mocker):
         soup.select_one(".problem_content").get_text())
 
 
+def test_page_parsed_once(mocker):
+    with open(str(SAVED / "solved_problem.html"), "rb") as f:
+        page = w.Page(FakeResponse(content=f.read(), url="problem=1"))
+
+    spy = mocker.spy(w, "BeautifulSoup")
+
+    assert w.get_soup(page) is w.get_soup(page)
+    assert spy.call_count == 1
+
+
+def test_page_parses_only_what_we_read(mocker):
+    with open(str(SAVED / "solved_problem.html"), "rb") as f:
+        page = w.Page(FakeResponse(content=f.read(), url="problem=1"))
+
+    assert page.soup.select_one("#info_panel")
+    assert page.soup.select_one("div.problem_content")
+    assert not page.soup.select_one("#nav")
+
+
+def test_request_get_does_not_parse(website, mocker):
+    website.add_answers("captcha.png")
+    spy = mocker.spy(w, "BeautifulSoup")
+
+    page = w.request_get(website, url_path="captcha/show_captcha.php")
+
+    assert page.content.startswith(b"\x89PNG")
+    assert spy.call_count == 0
+
+
 def test_check_solution_answer_good(mocker):
     with open(str(SAVED / "answer_correct.html")) as f:
         soup = w.get_soup(mocker.Mock(content=f.read()))
@@ -285,33 +431,76 @@ def test_get_logged_in_problem_page_not_logged_in(website, config, input, defaul
         "problem=1", "captcha/show_captcha.php", "sign_in", "problem=1"]
 
 
-def test_check_solution_solved_correct(website):
+def test_check_solution_solved_correct(website, config):
 
     website.add_answers("solved_problem.html")
 
     assert w.check_solution(website, 1, 233168) is True
+    assert config.get_answer(1) == 233168
 
 
-def test_check_solution_solved_incorrect(website):
+def test_check_solution_solved_incorrect(website, config):
 
     website.add_answers("solved_problem.html")
 
     assert w.check_solution(website, 1, 233135) is False
+    assert config.get_answer(1) == 233168
+
 
+def test_check_solution_known_answer(website, config):
+    config.set_answer(1, 233168)
 
-def test_check_solution_new_correct(website, input, default_open):
+    assert w.check_solution(website, 1, 233168) is True
+    assert w.check_solution(website, 1, 233135) is False
+    assert website.session.history == []
+
+
+def test_check_solution_new_correct(website, config, input, default_open):
     input.side_effect = ["12321"]
 
     website.add_answers("new_problem.html", "captcha.png",
                         "answer_correct.html")
 
     assert w.check_solution(website, 1, 233168) is True
+    assert config.get_answer(1) == 233168
 
 
-def test_check_solution_new_incorrect(website, input, default_open):
+def test_check_solution_new_incorrect(website, config, input, default_open):
     input.side_effect = ["12321"]
 
     website.add_answers("new_problem.html", "captcha.png",
                         "answer_incorrect.html")
 
     assert w.check_solution(website, 1, 233135) is False
+    assert config.get_answer(1) is None
+
+
+def test_refresh_answer(website, config):
+    config.set_answer(1, 12)
+    website.add_answers("solved_problem.html")
+
+    assert w.refresh_answer(website, 1) == 233168
+    assert config.get_answer(1) == 233168
+
+
+def test_refresh_answer_not_solved(website, config):
+    config.set_answer(1, 12)
+    website.add_answers("new_problem.html")
+
+    assert w.refresh_answer(website, 1) is None
+    assert config.get_answer(1) is None
+
+
+def test_get_progress(mocker):
+    with open(str(SAVED / "progress.html")) as f:
+        soup = w.get_soup(mocker.Mock(content=f.read()))
+
+    assert w.get_progress(soup) == ({1, 2, 3, 5, 8}, 10)
+
+
+def test_sync_progress(website, config):
+    website.add_answers("progress.html")
+
+    assert w.sync_progress(website) == {1, 2, 3, 5, 8}
+    assert website.session.history == ["progress"]
+    assert config.problem_count() == 10